@@ -1,165 +1,707 @@
 import numpy as np
+import functools
+import hashlib
+import json
 import math
+import os
+import sys
+import tempfile
+import time
+from array import array
+from collections import OrderedDict, deque
+from itertools import chain, islice
+
+import frontier
+import levels
+import out_of_core
+from incremental_order import IncrementalOrder
+
+
+GRAPH_TYPES = ["matrix", "bitmatrix", "list", "table", "csr", "mmap"]  # Supported representations (the position is stored in binary caches)
+LAYOUTS = ["circle", "layered"]  # Node placements of the LaTeX export
+
+
+def _build_csr(nodes, sources, targets): # Build (indptr, indices) arrays from parallel source/target arrays
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    if len(sources) > 1 and np.any(sources[1:] < sources[:-1]): # Edges added node by node are already grouped
+        order = np.argsort(sources, kind="stable") # Stable sort keeps the insertion order of each node's neighbors
+        sources = sources[order]
+        targets = targets[order]
+    indptr = np.zeros(nodes+2, dtype=np.int32) # Out-edges of node i are indices[indptr[i]:indptr[i+1]]
+    np.cumsum(np.bincount(sources, minlength=nodes+1), out=indptr[1:])
+    return indptr, np.ascontiguousarray(targets, dtype=np.int32)
+
+
+def _read_only(array): # Mark an array that is shared with the result cache or handed out by to_csr as read-only
+    array.flags.writeable = False
+    return array
+
+
+def _plain(value): # Whether a cached result is made only of tuples, lists, ints and None (what the result files can store)
+    if value is None or type(value) is int:
+        return True
+    return isinstance(value, (tuple, list)) and all(_plain(item) for item in value)
+
+
+def _tuples(value): # JSON lists back to the tuples the result cache holds
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+class TraversalState: # Per-traversal buffers, allocated once and reset in bulk, so traversals never share state through the graph
+    __slots__ = ("size", "visited", "index", "low_link", "on_stack", "stack", "time", "_zero_flags", "_zero_ints")
+
+    def __init__(self, nodes):
+        self.size = nodes + 1
+        self._zero_flags = bytes(self.size)  # Templates copied over the buffers by reset()
+        self._zero_ints = bytes(4 * self.size)
+        self.visited = bytearray(self.size)  # 1 once a traversal has reached the node
+        self.index = array('i', self._zero_ints)  # Discovery index for Tarjan's algorithm (1, 2, ...), separate from the visited flag
+        self.low_link = array('i', self._zero_ints)  # Smallest discovery index reachable from the node
+        self.on_stack = bytearray(self.size)  # 1 while the node is on Tarjan's stack
+        self.stack = []
+        self.time = 0  # Last discovery index handed out
+
+    def reset(self): # Zero every buffer with one memory copy each
+        self.visited[:] = self._zero_flags
+        self.on_stack[:] = self._zero_flags
+        memoryview(self.index).cast('B')[:] = self._zero_ints
+        memoryview(self.low_link).cast('B')[:] = self._zero_ints
+        self.stack.clear()
+        self.time = 0
+
+
+class GraphStats: # Counters and timers collected while Graph.enable_stats() is on
+    def __init__(self):
+        self.nodes_visited = 0  # Nodes whose neighbors were read by a traversal
+        self.edges_scanned = 0  # Edges read by traversals
+        self.stack_high_water = 0  # Deepest explicit stack / queue seen in tarjan, dfs and topological_sort
+        self.calls = {}  # Method name -> number of calls
+        self.seconds = {}  # Method name -> total time spent (perf_counter)
+        self.memory = 0  # Bytes used by the graph representation (Graph.memory_usage)
+
+    def __str__(self):
+        lines = [f"nodes visited: {self.nodes_visited}",
+                 f"edges scanned: {self.edges_scanned}",
+                 f"stack high-water mark: {self.stack_high_water}",
+                 f"representation memory: {self.memory} bytes"]
+        for name in self.seconds:
+            lines.append(f"{name}: {self.calls[name]} call(s), {self.seconds[name]:.6f}s")
+        return "\n".join(lines)
+
+
+def _timed(method): # Time a Graph method into graph.stats, costs a single check when stats are disabled
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.stats is None:
+            return method(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            name = method.__name__
+            self.stats.calls[name] = self.stats.calls.get(name, 0) + 1
+            self.stats.seconds[name] = self.stats.seconds.get(name, 0.0) + time.perf_counter() - start
+    return wrapper
 
 
 class Graph:
-    def __init__(self, nodes, graph_type):
+    def __init__(self, nodes, graph_type, directory=None): # directory: where an mmap graph keeps its files (default $TMPDIR, which may be in memory)
         self.nodes = nodes
         self.graph_type = graph_type
         if graph_type == "matrix":
-            self.graph = np.zeros((nodes+1, nodes+1))  # Initialize an adjacency matrix with zeros
+            self.graph = np.zeros((nodes+1, nodes+1), dtype=bool)  # Initialize an adjacency matrix with zeros (1 byte per cell)
+        elif graph_type == "bitmatrix":
+            self.graph = np.zeros((nodes+1, (nodes+8) // 8), dtype=np.uint8)  # Adjacency matrix with every row packed into bits (np.packbits layout)
         elif graph_type == "list":
             self.graph = {i: [] for i in range(1, nodes+1)}  # Initialize an adjacency list
         elif graph_type == "table":
             self.graph = []  # Initialize an edge table
+            self._table_index = None  # Source-sorted (offsets, targets) index over the edge table, built lazily
+        elif graph_type == "csr":
+            self.graph = tuple(map(_read_only, _build_csr(nodes, [], [])))  # Initialize compressed sparse row arrays (indptr, indices)
+            self._pending_edges = []  # (sources, targets) chunks added since the arrays were last built
+        elif graph_type == "mmap":
+            self.graph = out_of_core.EdgeStore(tempfile.mkdtemp(prefix="graph_", dir=directory), nodes)  # CSR arrays in memory-mapped files, for graphs larger than memory
 
 
-        self.visited = [False] * (nodes + 1)  # Keep track of visited nodes during traversal (DFS, Tarjan's algorithm)
-        self.stack = []  # Stack for Tarjan's algorithm
-        self.low_link = [0] * (nodes + 1)  # Low link values for Tarjan's algorithm, the smallest visited node reachable from the current node
-        self.on_stack = [False] * (nodes + 1)  # Keep track of nodes on the stack in Tarjan's algorithm
-        self.time = 0  # Time counter for Tarjan's algorithm -> used for assigning visited times to nodes (depth)
+        self.state = TraversalState(nodes)  # State of dfs() / tarjan() between calls, cleared by reset_visited()
         self.sccs = []  # list with the results of Tarjan's algorithm
+        self.order_tracker = None  # IncrementalOrder kept up to date by add_edge (see track_order)
+        self.stats = None  # GraphStats while instrumentation is enabled (see enable_stats)
+        self.commands = []  # Commands that followed the graph in the file it was loaded from (e.g. "tarjan", "exit")
+        self.generation = 0  # Bumped by every add_edge / add_edges, cached results belong to one generation
+        self.cache_size = 32  # Maximum number of cached results
+        self._results = OrderedDict()  # (method, arguments) -> result, least recently used first
+        self._results_generation = 0
+
+    @classmethod
+    def from_file(cls, file_path, graph_type=None, batch_lines=65536, directory=None): # Stream a graph in the dag_file format (type, nodes, one line of successors per node)
+        with open(file_path, 'r') as file:
+            file_type = file.readline().strip()  # Graph type
+            nodes = int(file.readline().strip())  # Number of nodes
+            graph = cls(nodes, graph_type or file_type, directory)
+            node = 1
+            while node <= nodes:
+                lines = list(islice(file, min(batch_lines, nodes - node + 1)))  # Read the successor lines in batches, never the whole file
+                if not lines:
+                    break
+                counts = [len(line.split()) for line in lines]  # Number of successors of every node in the batch
+                targets = np.fromstring("".join(lines), dtype=np.int32, sep=" ") if sum(counts) else np.empty(0, dtype=np.int32)  # Parse the whole batch at once
+                sources = np.repeat(np.arange(node, node + len(lines), dtype=np.int32), counts)
+                graph.add_edges(sources, targets)
+                node += len(lines)
+            graph.commands = [line.strip() for line in file if line.strip()]  # Commands after the graph
+        return graph
+
+    def save_file(self, file_path, commands=()): # Write the graph in the dag_file format read by from_file
+        indptr, indices = self.to_csr()
+        with open(file_path, 'w') as file:
+            file.write(f"{self.graph_type}\n{self.nodes}\n")
+            lines = []
+            for node in range(1, self.nodes+1):
+                lines.append(" ".join(map(str, indices[indptr[node]:indptr[node+1]].tolist())))
+                if len(lines) == 65536:  # Write in large chunks instead of once per node
+                    file.write("\n".join(lines) + "\n")
+                    lines = []
+            if lines:
+                file.write("\n".join(lines) + "\n")
+            for command in commands:
+                file.write(f"{command}\n")
+
+    def save_cache(self, cache_path, graph_type=None): # Save the graph as a raw int32 edge array (.npy) that from_cache can memory-map
+        edges = np.lib.format.open_memmap(cache_path, mode="w+", dtype=np.int32, shape=(len(self.to_csr()[1]) + 1, 2))  # Filled a block at a time
+        edges[0] = (self.nodes, GRAPH_TYPES.index(graph_type or self.graph_type))  # Header row: number of nodes and representation
+        row = 1
+        for sources, targets in self.edge_blocks():
+            edges[row:row+len(sources), 0] = sources
+            edges[row:row+len(sources), 1] = targets
+            row += len(sources)
+        edges.flush()
+
+    @classmethod
+    def from_cache(cls, cache_path, graph_type=None, directory=None): # Load a graph saved with save_cache without parsing any text
+        edges = np.load(cache_path, mmap_mode="r")  # Memory-mapped, the edges are only read when the graph is built
+        nodes, type_index = edges[0].tolist()
+        graph = cls(nodes, graph_type or GRAPH_TYPES[type_index], directory)
+        graph.add_edges(edges[1:, 0], edges[1:, 1])
+        return graph
+
+    @classmethod
+    def load(cls, file_path, graph_type=None, directory=None): # Load a dag_file, using (and refreshing) a binary cache next to it
+        cache_path = file_path + ".npy"
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(file_path):
+            return cls.from_cache(cache_path, graph_type, directory)
+        graph = cls.from_file(file_path, graph_type, directory=directory)
+        with open(file_path, 'r') as file:
+            graph.save_cache(cache_path, file.readline().strip())  # The cache keeps the type written in the file
+        return graph
 
     def add_edge(self, node, edges): # Add an edge to the graph
+        self.generation += 1  # Cached results no longer describe the graph
+        if self.order_tracker is not None:
+            if self.graph_type == "list":
+                self.order_tracker.remove_edges(node, self.graph[node])  # The adjacency list of the node is replaced
+            self.order_tracker.add_edges(node, edges)
         if self.graph_type == "matrix":
-            for edge in edges:
-                self.graph[node][edge] = 1  # Add an edge in the adjacency matrix
+            self.graph[node, np.asarray(edges, dtype=np.int32)] = True  # Add the edges in the adjacency matrix
+        elif self.graph_type == "bitmatrix":
+            edges = np.asarray(edges, dtype=np.int32)
+            np.bitwise_or.at(self.graph[node], edges >> 3, (0x80 >> (edges & 7)).astype(np.uint8))  # Set the bit of every edge
         elif self.graph_type == "list":
             self.graph[node] = edges  # Add edges in the adjacency list
         elif self.graph_type == "table":
             for edge in edges:
                 self.graph.append((node, edge))  # Add an edge in the edge table
+            self._table_index = None  # The index no longer matches the table
+        elif self.graph_type == "csr":
+            edges = np.asarray(edges, dtype=np.int32)
+            self._pending_edges.append((np.full(len(edges), node, dtype=np.int32), edges))  # Buffer the edges, the arrays are rebuilt in bulk
+        elif self.graph_type == "mmap":
+            edges = np.asarray(edges, dtype=np.int32)
+            self.graph.append(np.full(len(edges), node, dtype=np.int32), edges)  # Written to a run file, merged when the arrays are next read
         else:
             raise ValueError(f"Unknown graph type: {self.graph_type}")
 
+    def add_edges(self, sources, targets): # Add many edges at once from two parallel arrays (source[i] -> target[i])
+        self.generation += 1
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        if self.order_tracker is not None:
+            for node, edge in zip(sources.tolist(), targets.tolist()):
+                self.order_tracker.add_edge(node, edge)
+        if self.graph_type == "matrix":
+            self.graph[sources, targets] = True
+        elif self.graph_type == "bitmatrix":
+            np.bitwise_or.at(self.graph, (sources, targets >> 3), (0x80 >> (targets & 7)).astype(np.uint8))
+        elif self.graph_type == "list":
+            order = np.argsort(sources, kind="stable")  # Group the edges by source node
+            nodes, starts = np.unique(sources[order], return_index=True)
+            for node, edges in zip(nodes.tolist(), np.split(targets[order], starts[1:])):
+                self.graph[node].extend(edges.tolist())
+        elif self.graph_type == "table":
+            self.graph.extend(zip(sources.tolist(), targets.tolist()))
+            self._table_index = None
+        elif self.graph_type == "csr":
+            self._pending_edges.append((sources, targets))
+        elif self.graph_type == "mmap":
+            self.graph.append(sources, targets)
+        else:
+            raise ValueError(f"Unknown graph type: {self.graph_type}")
+
+    def _csr(self): # CSR arrays of the "csr" representation, merging edges added since the last build
+        if self._pending_edges:
+            indptr, indices = self.graph
+            sources = [np.repeat(np.arange(self.nodes+1, dtype=np.int32), np.diff(indptr))]  # Edges that are already built
+            targets = [indices]
+            for chunk_sources, chunk_targets in self._pending_edges:
+                sources.append(chunk_sources)
+                targets.append(chunk_targets)
+            self.graph = tuple(map(_read_only, _build_csr(self.nodes, np.concatenate(sources), np.concatenate(targets))))  # Handed out by to_csr
+            self._pending_edges = []
+        return self.graph
+
+    def _cached(self, key, compute): # Result of compute() for the current generation, kept in a bounded LRU cache
+        if self._results_generation != self.generation:
+            self._results.clear()
+            self._results_generation = self.generation
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key]
+        value = compute()
+        self._results[key] = value
+        while len(self._results) > self.cache_size:
+            self._results.popitem(last=False)
+        return value
+
+    def clear_results(self): # Drop every cached result (e.g. to time the algorithms themselves)
+        self._results.clear()
+
+    def fingerprint(self): # Hash of the edges, identifies the graph a saved result cache belongs to
+        indptr, indices = self.to_csr()
+        digest = hashlib.sha1(indptr.tobytes())
+        for start in range(0, len(indices), out_of_core.CHUNK_EDGES):  # Never copies all the edges at once
+            digest.update(indices[start:start+out_of_core.CHUNK_EDGES].tobytes())
+        return digest.hexdigest()
+
+    def save_results(self, path): # Store the cached results made of ints (not the derived arrays) as JSON next to the graph file
+        fingerprint = self._cached(("fingerprint",), self.fingerprint)  # Also validates the generation of the cache
+        results = [[list(key), value] for key, value in self._results.items() if key[0] != "fingerprint" and _plain(value)]
+        with open(path, 'w') as file:
+            json.dump({"fingerprint": fingerprint, "results": results}, file)
+
+    def load_results(self, path): # Reuse results saved by save_results if they were computed on the same edges
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except ValueError:  # Not a results file (e.g. one written by an older version), it is overwritten on the next save
+            return False
+        if data.get("fingerprint") != self._cached(("fingerprint",), self.fingerprint):
+            return False
+        for key, value in data["results"]:
+            value = _tuples(value)
+            self._cached(tuple(key), lambda: value)
+        return True
+
+    def to_csr(self): # Convert any representation to CSR arrays (indptr, indices), keeping the neighbor order
+        if self.graph_type in ("matrix", "bitmatrix", "list"):
+            return self._cached(("to_csr",), self._convert_to_csr)
+        elif self.graph_type == "table":
+            return self._table_csr()
+        elif self.graph_type == "mmap":
+            return self.graph.csr()
+        return self._csr()
+
+    def _convert_to_csr(self):
+        if self.graph_type in ("matrix", "bitmatrix"):
+            sources, targets = [], []
+            for start, block in self._matrix_blocks():
+                block_sources, block_targets = np.nonzero(block)
+                sources.append(block_sources + start)
+                targets.append(block_targets)
+            return tuple(map(_read_only, _build_csr(self.nodes, np.concatenate(sources), np.concatenate(targets))))
+        elif self.graph_type == "list":
+            sources = np.repeat(np.arange(1, self.nodes+1), [len(self.graph[node]) for node in range(1, self.nodes+1)])
+            targets = [edge for node in range(1, self.nodes+1) for edge in self.graph[node]]
+            return tuple(map(_read_only, _build_csr(self.nodes, sources, targets)))
+
+    def _matrix_blocks(self, cells=1 << 24): # Row blocks of the matrix as (first row, boolean block) of about `cells` cells, unpacking bit rows a block at a time
+        rows = max(1, cells // (self.nodes+1))  # Sized in bytes, a fixed row count would unpack gigabytes on large graphs
+        for start in range(0, self.nodes+1, rows):
+            if self.graph_type == "matrix":
+                yield start, self.graph[start:start+rows]  # A view, nothing is copied
+            else:
+                yield start, np.unpackbits(self.graph[start:start+rows], axis=1, count=self.nodes+1).view(bool)
+
+    def edge_blocks(self, block=65536): # Stream the edges as (sources, targets) int32 arrays straight from the representation
+        if self.graph_type in ("matrix", "bitmatrix"):
+            for start, rows in self._matrix_blocks(block):
+                sources, targets = np.nonzero(rows)
+                yield (sources + start).astype(np.int32), targets.astype(np.int32)
+        elif self.graph_type == "table":
+            for start in range(0, len(self.graph), block):
+                edges = np.array(self.graph[start:start+block], dtype=np.int32).reshape(-1, 2)
+                yield edges[:, 0], edges[:, 1]
+        elif self.graph_type in ("csr", "mmap"):
+            indptr, indices = self.to_csr()
+            for start in range(1, self.nodes+1, block):
+                stop = min(start + block, self.nodes+1)
+                sources = np.repeat(np.arange(start, stop, dtype=np.int32), np.diff(indptr[start:stop+1]))
+                yield sources, indices[indptr[start]:indptr[stop]]
+        else:
+            for start in range(1, self.nodes+1, block):
+                stop = min(start + block, self.nodes+1)
+                counts = [len(self.graph[node]) for node in range(start, stop)]
+                targets = np.fromiter(chain.from_iterable(self.graph[node] for node in range(start, stop)), dtype=np.int32, count=sum(counts))
+                yield np.repeat(np.arange(start, stop, dtype=np.int32), counts), targets
+
+    def _table_csr(self): # Offsets per source node over the edge table, rebuilt only after the table has changed
+        if self._table_index is None:
+            edges = np.array(self.graph, dtype=np.int32).reshape(-1, 2)
+            self._table_index = tuple(map(_read_only, _build_csr(self.nodes, edges[:, 0], edges[:, 1])))  # Handed out by to_csr
+        return self._table_index
+
+    def in_degrees(self): # Number of incoming edges of every node, computed once per generation (index 0 is unused)
+        return self._cached(("in_degrees",), self._count_in_degrees)
+
+    def _count_in_degrees(self):
+        if self.graph_type in ("matrix", "bitmatrix"):
+            in_degree = sum(np.count_nonzero(block, axis=0) for _, block in self._matrix_blocks())
+        elif self.graph_type == "mmap":
+            in_degree = out_of_core.in_degrees(*self.to_csr(), self.graph.scratch("in_degree", np.int64, self.nodes+1))
+        else:
+            in_degree = np.bincount(self.to_csr()[1], minlength=self.nodes+1)
+        in_degree.flags.writeable = False  # Shared by every caller until the graph changes
+        return in_degree
+
+    def track_order(self): # Maintain a topological order while edges are added, returns the IncrementalOrder
+        if self.graph_type == "mmap":
+            raise ValueError("The incremental order keeps every edge in memory, it is not available for mmap graphs.")
+        self.order_tracker = IncrementalOrder(self)
+        return self.order_tracker
+
+    def enable_stats(self): # Start collecting counters and timers, returns the GraphStats object (see refresh_stats for the memory figure)
+        self.stats = GraphStats()
+        self.stats.memory = self.memory_usage()
+        return self.stats
+
+    def refresh_stats(self): # Measure the representation again, edges and cached arrays change it after enable_stats
+        self.stats.memory = self.memory_usage()
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+
+    def memory_usage(self): # Approximate number of bytes held by the graph representation (and its cached CSR arrays)
+        if self.graph_type in ("matrix", "bitmatrix", "list"):
+            return self._representation_size() + sum(array.nbytes for array in self._results.get(("to_csr",), ()))
+        return self._representation_size()
+
+    def _representation_size(self):
+        if self.graph_type in ("matrix", "bitmatrix"):
+            return self.graph.nbytes
+        elif self.graph_type == "mmap":
+            return self.graph.memory_usage()
+        elif self.graph_type == "csr":
+            indptr, indices = self.graph
+            return indptr.nbytes + indices.nbytes + sum(a.nbytes + b.nbytes for a, b in self._pending_edges)
+        elif self.graph_type == "table":
+            size = sys.getsizeof(self.graph) + sum(sys.getsizeof(edge) for edge in self.graph)  # The ints are shared small-int objects up to 256
+            if self._table_index is not None:
+                size += self._table_index[0].nbytes + self._table_index[1].nbytes
+            return size
+        return sys.getsizeof(self.graph) + sum(sys.getsizeof(edges) for edges in self.graph.values())
+
+    @_timed
     def find_start_node(self): # Find a node with no incoming edges to use in topological sort
+        in_degree = self.in_degrees()
         for node in range(1, self.nodes+1): # Iterate over all nodes
-            if not self.visited[node]: # If the node has not been visited
-                if self.graph_type == "matrix":
-                    if all(self.graph[other_node][node] == 0 for other_node in range(1, self.nodes+1)): # Check if there are no incoming edges
-                        return node
-                elif self.graph_type == "table":
-                    if all(edge[1] != node for edge in self.graph): # Check if there are no incoming edges
-                        return node
-                else:
-                    if all(node not in self.graph[other_node] for other_node in self.graph): # Check if there are no incoming edges
-                        return node
+            if not self.state.visited[node] and in_degree[node] == 0: # If the node has not been visited and has no incoming edges
+                return node
         return None
 
-    def tarjan(self, node): # Tarjan's algorithm for sorting topologically
-        self.low_link[node] = self.time 
-        self.visited[node] = self.time # Assign the visited time to the node
-        self.time += 1
-        self.stack.append(node) # Add the node to the stack
-        self.on_stack[node] = True # Mark the node as being on the stack
+    @_timed
+    def topological_sort(self): # Kahn's algorithm -> (topological order, nodes left over because of a cycle)
+        if self.graph_type == "mmap":
+            return tuple(array.tolist() for array in self.topological_sort_arrays())
+        order, remaining = self._cached(("topological_sort",), self._topological_sort)
+        return list(order), list(remaining) # Copies, the cached result stays intact
+
+    def topological_sort_arrays(self): # Same as topological_sort as read-only arrays, memory-mapped on mmap graphs so no list of every node is built
+        if self.graph_type == "mmap":
+            return self._cached(("topological_sort_arrays",), lambda: out_of_core.topological_sort(self.graph))
+        return tuple(_read_only(np.array(part, dtype=np.int32)) for part in self._cached(("topological_sort",), self._topological_sort))
+
+    def _topological_sort(self):
+        in_degree = self.in_degrees().tolist()
+        order = tuple(self._kahn(in_degree))
+        remaining = tuple(node for node in range(1, self.nodes+1) if in_degree[node] > 0) # Nodes on a cycle or reachable only through one
+        return order, remaining
+
+    @_timed
+    def tarjan_order(self): # Components found by Tarjan's algorithm from the first source node, in topological order (None on a cycle)
+        return self._cached(("tarjan_order",), self._tarjan_order)
+
+    def _tarjan_order(self):
+        in_degree = self.in_degrees()
+        sources = np.flatnonzero(in_degree[1:] == 0)
+        if len(sources) == 0:
+            return None
+        sccs = [tuple(scc) for scc in self.iter_sccs(int(sources[0]) + 1)]
+        sccs.reverse()
+        return tuple(sccs)
 
+    @_timed
+    def scc_order(self): # Strongly connected components of the whole graph in topological order, also when the graph has cycles
+        return [list(scc) for scc in self._cached(("scc_order",), self._scc_order)]
+
+    def _scc_order(self):
+        sccs = [tuple(scc) for scc in self.iter_sccs()]  # Every unvisited node starts a new search, so no component is dropped
+        sccs.reverse()  # Tarjan's algorithm finishes the components in reverse topological order
+        return tuple(sccs)
+
+    @_timed
+    def condensation(self): # (component of every node, DAG of the components as a csr Graph), components are numbered 1.. in topological order
+        component, indptr, indices = self._cached(("condensation",), self._condensation)
+        dag = Graph(len(indptr) - 2, "csr")
+        dag.graph = (indptr, indices)
+        return component, dag
+
+    def _condensation(self):
+        sccs = self._cached(("scc_order",), self._scc_order)
+        count = len(sccs)
+        component = np.zeros(self.nodes+1, dtype=np.int32)  # Index 0 is unused
+        members = np.fromiter(chain.from_iterable(sccs), dtype=np.int32, count=self.nodes)
+        component[members] = np.repeat(np.arange(1, count+1, dtype=np.int32), [len(scc) for scc in sccs])
+        indptr, indices = self.to_csr()
+        sources = component[np.repeat(np.arange(self.nodes+1), np.diff(indptr))]
+        targets = component[indices]
+        keys = sources.astype(np.int64) * (count+1) + targets  # One int64 key per edge between components
+        keys = np.sort(keys[sources != targets])
+        keys = keys[np.diff(keys, prepend=-1) != 0]  # Keep one edge per pair of components
+        indptr, indices = _build_csr(count, keys // (count+1), keys % (count+1))
+        for array in (component, indptr, indices):
+            array.flags.writeable = False  # Shared by every caller until the graph changes
+        return component, indptr, indices
+
+    def iter_topological(self): # Yield the nodes in Kahn's topological order as they are found (nodes on a cycle are never yielded)
+        return self._kahn(self.in_degrees().tolist())
+
+    def _kahn(self, in_degree): # Kahn's algorithm over an in-degree list, which it consumes
+        queue = deque(node for node in range(1, self.nodes+1) if in_degree[node] == 0) # Start from every node with no incoming edges
+        stats = self.stats
+        while queue:
+            if stats is not None and len(queue) > stats.stack_high_water:
+                stats.stack_high_water = len(queue)
+            node = queue.popleft()
+            yield node
+            for neighbor in self._successors(node):
+                in_degree[neighbor] -= 1 # Remove the edge node -> neighbor
+                if in_degree[neighbor] == 0: # All predecessors of the neighbor are already in the order
+                    queue.append(neighbor)
+
+    @_timed
+    def topological_levels(self, processes=0): # Levels of the DAG (every node after all its predecessors' levels) -> (levels, nodes left over because of a cycle)
+        graph_levels, remaining = self._cached(("topological_levels",), lambda: levels.topological_levels(*self.to_csr(), processes))
+        return [list(level) for level in graph_levels], list(remaining)
+
+    @_timed
+    def bfs_distances(self, sources): # Edges on a shortest path from the sources to every node (-1 when unreachable), a whole frontier per NumPy step
+        return frontier.bfs_distances(*self.to_csr(), sources)
+
+    @_timed
+    def reachable(self, sources): # Nodes reachable from the sources (the sources included), in ascending order
+        return frontier.reachable(*self.to_csr(), sources).tolist()
+
+    @_timed
+    def frontier_order(self): # Kahn's order computed a whole frontier at a time -> (order, nodes left over because of a cycle) as arrays
+        return frontier.topological_order(*self.to_csr())
+
+    def _successors(self, node): # Neighbors of a node, in the order each representation stores them
         if self.graph_type == "matrix":
-            for neighbor in range(1, self.nodes+1): 
-                if self.graph[node][neighbor]: # If there is an edge
-                    if not self.visited[neighbor]: # If the neighbor has not been visited
-                        self.tarjan(neighbor) # Perform Tarjan's algorithm on the neighbor
-                        self.low_link[node] = min(self.low_link[node], self.low_link[neighbor]) # Update the low link value
-                    elif self.on_stack[neighbor]: # If the neighbor is on the stack
-                        self.low_link[node] = min(self.low_link[node], self.visited[neighbor]) # Update the low link value
+            neighbors = np.flatnonzero(self.graph[node]).tolist() # Scan the whole row at once instead of cell by cell
+        elif self.graph_type == "bitmatrix":
+            neighbors = np.flatnonzero(np.unpackbits(self.graph[node], count=self.nodes+1)).tolist()
         elif self.graph_type == "table":
-            for edge in self.graph:
-                if edge[0] == node:
-                    neighbor = edge[1]
-                    if not self.visited[neighbor]:
-                        self.tarjan(neighbor)
-                        self.low_link[node] = min(self.low_link[node], self.low_link[neighbor])
-                    elif self.on_stack[neighbor]:
-                        self.low_link[node] = min(self.low_link[node], self.visited[neighbor])
+            offsets, targets = self._table_csr()
+            neighbors = targets[offsets[node]:offsets[node+1]].tolist()
+        elif self.graph_type in ("csr", "mmap"):
+            indptr, indices = self.to_csr()
+            neighbors = indices[indptr[node]:indptr[node+1]].tolist()
         else:
-            for neighbor in self.graph[node]:
-                if not self.visited[neighbor]:
-                    self.tarjan(neighbor)
-                    self.low_link[node] = min(self.low_link[node], self.low_link[neighbor])
-                elif self.on_stack[neighbor]:
-                    self.low_link[node] = min(self.low_link[node], self.visited[neighbor])
-
-        if self.low_link[node] == self.visited[node]:
-            scc = []  # Initialize a new strongly connected component
-            while True:
-                w = self.stack.pop()
-                scc.append(w)  # Add the node to the strongly connected component
-                self.on_stack[w] = False
-                if w == node:
-                    break
-            self.sccs.append(scc)  # Add the strongly connected component to the list
-                    
-    def export(self, tex_file):     # Export the graph to a LaTeX file
-        tex_file.write("\\documentclass{standalone}\n")
-        tex_file.write("\\usepackage{tikz}\n")
-        tex_file.write("\\begin{document}\n")
-        tex_file.write("\\begin{tikzpicture}[->,>=stealth]\n")
-
-        # Number of nodes
-        num_nodes = self.nodes 
-
-        # Radius of the circle (multiple of the number of nodes)
-        radius = num_nodes * 0.5
-
-        # Nodes on the circle
-        for i in range(1, num_nodes+1):
-            angle = 2 * math.pi * i / num_nodes
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            tex_file.write(f"    \\node ({i}) at ({x},{y}) {{{i}}};\n")
+            neighbors = self.graph[node]
+        if self.stats is not None: # Every traversal reads the neighbors of a node once per visit
+            self.stats.nodes_visited += 1
+            self.stats.edges_scanned += len(neighbors)
+        return neighbors
+
+    @_timed
+    def tarjan(self, node): # Tarjan's algorithm for sorting topologically (explicit stack, no recursion)
+        self.sccs.extend(self._tarjan_components([node], self.state)) # The state is kept on the graph between calls
+
+    def iter_sccs(self, start=None, state=None): # Yield strongly connected components as Tarjan's algorithm finds them (reverse topological order)
+        state = self._fresh_state(state)
+        return self._tarjan_components(range(1, self.nodes+1) if start is None else [start], state)
+
+    def _fresh_state(self, state): # A reset TraversalState: the caller's (reused across traversals) or a new one
+        if state is None:
+            return TraversalState(self.nodes)
+        state.reset()
+        return state
+
+    def _tarjan_components(self, roots, state): # Tarjan's algorithm from every unvisited root, yielding each component
+        visited, index, low_link, on_stack, stack = state.visited, state.index, state.low_link, state.on_stack, state.stack # Local names for the hot loop
+        successors = self._successors
+        for root in roots:
+            if visited[root]:
+                continue
+            state.time += 1 # Assign the discovery index to the node and put it on the stack
+            index[root] = low_link[root] = state.time
+            visited[root] = on_stack[root] = True
+            stack.append(root)
+            work = [(root, iter(successors(root)))] # Frames of (node, iterator over its remaining neighbors)
+
+            while work:
+                node, neighbors = work[-1]
+                for neighbor in neighbors:
+                    if not visited[neighbor]: # If the neighbor has not been visited, descend into it
+                        state.time += 1
+                        index[neighbor] = low_link[neighbor] = state.time
+                        visited[neighbor] = on_stack[neighbor] = True
+                        stack.append(neighbor)
+                        work.append((neighbor, iter(successors(neighbor))))
+                        if self.stats is not None and len(work) > self.stats.stack_high_water:
+                            self.stats.stack_high_water = len(work)
+                        break
+                    elif on_stack[neighbor]: # If the neighbor is on the stack
+                        if index[neighbor] < low_link[node]: # Update the low link value
+                            low_link[node] = index[neighbor]
+                else: # All neighbors processed -> the node is finished
+                    work.pop()
+                    if low_link[node] == index[node]:
+                        scc = []  # Initialize a new strongly connected component
+                        while True:
+                            w = stack.pop()
+                            scc.append(w)  # Add the node to the strongly connected component
+                            on_stack[w] = False
+                            if w == node:
+                                break
+                        yield scc
+                    if work: # Propagate the low link value to the parent, as the recursive return did
+                        parent = work[-1][0]
+                        if low_link[node] < low_link[parent]:
+                            low_link[parent] = low_link[node]
+
+    def _edges(self, shown=None): # Edges as (node, successor) pairs in the order export has always written them, only those leaving the shown nodes (ascending)
+        if self.graph_type == "table":
+            yield from self.graph
+            return
+        indptr, indices = self.to_csr()
+        for node in range(1, self.nodes+1) if shown is None else shown:
+            for edge in indices[indptr[node]:indptr[node+1]].tolist():  # One node's edges at a time, never a list of every edge
+                yield node, edge
+
+    def _layout(self, layout, shown): # Coordinates of the exported nodes -> {node: (x, y)}
+        if layout == "circle":
+            num_nodes = len(shown) # Number of exported nodes, they are spread over the whole circle
+            radius = min(num_nodes * 0.5, 250) # Radius of the circle (multiple of the number of nodes), the picture stays under TeX's maximum dimension (about 575cm)
+            positions = {}
+            for position, i in enumerate(shown, 1): # Nodes on the circle
+                angle = 2 * math.pi * position / num_nodes
+                positions[i] = (radius * math.cos(angle), radius * math.sin(angle))
+            return positions
+        elif layout == "layered":
+            graph_levels, remaining = self.topological_levels()
+            rows = [[node for node in level if node in shown] for level in graph_levels + [remaining]] # Nodes on a cycle go to the last row
+            rows = [row for row in rows if row]
+            widest = max((len(row) for row in rows), default=1)
+            step = min(1.5, 500 / max(widest - 1, 1)) # Keep the picture under TeX's maximum dimension (about 575cm)
+            row_step = min(1.5, 500 / max(len(rows) - 1, 1))
+            return {node: (round(column * step, 3), round(-row_number * row_step, 3))
+                    for row_number, row in enumerate(rows) for column, node in enumerate(row)}
+        raise ValueError(f"Unknown layout: {layout}")
+
+    @_timed
+    def export(self, tex_file, layout="circle", max_nodes=None, seed=None): # Export the graph to a LaTeX file
+        shown = range(1, self.nodes+1)
+        if max_nodes is not None and self.nodes > max_nodes: # Export only part of a large graph: a random sample with a seed, else the first nodes
+            if seed is None:
+                shown = range(1, max_nodes+1)
+            else:
+                shown = sorted((np.random.default_rng(seed).choice(self.nodes, max_nodes, replace=False) + 1).tolist())
+        shown_set = set(shown)
+
+        lines = ["\\documentclass{standalone}\n",
+                 "\\usepackage{tikz}\n",
+                 "\\begin{document}\n",
+                 "\\begin{tikzpicture}[->,>=stealth]\n"]
+
+        def flush(): # Write the collected lines in one call
+            tex_file.write("".join(lines))
+            lines.clear()
+
+        # Nodes
+        for i, (x, y) in self._layout(layout, shown_set if layout == "layered" else shown).items():
+            lines.append(f"    \\node ({i}) at ({x},{y}) {{{i}}};\n")
+            if len(lines) >= 65536:
+                flush()
 
         # Edges
-        if self.graph_type == "matrix":
-            for i in range(1, num_nodes+1):
-                for j in range(1, num_nodes+1):
-                    if self.graph[i][j]:
-                        if i == j:  # Check if there is a connection to the same node
-                            tex_file.write(f"    \\draw ({i}) edge [out=45, in=135, distance=1cm] ({i});\n")
-                        else:
-                            tex_file.write(f"    \\draw ({i}) -- ({j});\n")
-        elif self.graph_type == "table":
-            for edge in self.graph:
-                if edge[0] == edge[1]:  # Check if there is a connection to the same node
-                    tex_file.write(f"    \\draw ({edge[0]}) edge [out=45, in=135, distance=1cm] ({edge[0]});\n")
+        for node, edge in self._edges(shown):
+            if node in shown_set and edge in shown_set:
+                if node == edge:  # Check if there is a connection to the same node
+                    lines.append(f"    \\draw ({node}) edge [out=45, in=135, distance=1cm] ({node});\n")
                 else:
-                    tex_file.write(f"    \\draw ({edge[0]}) -- ({edge[1]});\n")
-        else:
-            for node, edges in self.graph.items():
-                for edge in edges:
-                    if node == edge:  # Check if there is a connection to the same node
-                        tex_file.write(f"    \\draw ({node}) edge [out=45, in=135, distance=1cm] ({node});\n")
-                    else:
-                        tex_file.write(f"    \\draw ({node}) -- ({edge});\n")
-
-        tex_file.write("\\end{tikzpicture}\n")
-        tex_file.write("\\end{document}\n")
-
-    def reset_visited(self): # Reset visited list before running DFS
-        self.visited = [False] * (self.nodes + 1)
-
-    def dfs(self, node):    # Depth-First Search
-        if self.visited[node]: # If the node has been visited, return an empty list
-            return []
-        self.visited[node] = True
-        nodes = [node] # Initialize a list with the current node
-        if self.graph_type == "matrix":
-            for neighbor in range(1, self.nodes+1): # Iterate over all neighbors
-                if self.graph[node][neighbor] and not self.visited[neighbor]: # If there is an edge and the neighbor has not been visited
-                    nodes += self.dfs(neighbor) # Perform DFS on the neighbor
-        elif self.graph_type == "table":
-            for edge in self.graph:
-                if edge[0] == node and not self.visited[edge[1]]: # If the edge starts at the current node and the neighbor has not been visited
-                    nodes += self.dfs(edge[1]) # Perform DFS on the neighbor
-        else:
-            for neighbor in self.graph[node]:
-                if not self.visited[neighbor]: # If the neighbor has not been visited
-                    nodes += self.dfs(neighbor) # Perform DFS on the neighbor
-        return nodes
+                    lines.append(f"    \\draw ({node}) -- ({edge});\n")
+                if len(lines) >= 65536:
+                    flush()
+
+        lines.append("\\end{tikzpicture}\n")
+        lines.append("\\end{document}\n")
+        flush()
+
+    def reset_visited(self): # Reset the per-run state before running DFS or Tarjan's algorithm, so runs do not add up
+        self.state.reset()
+        self.sccs = []
 
+    def dfs(self, node):    # Depth-First Search from a node, skipping nodes visited by earlier calls
+        return list(self._dfs_order([node], self.state.visited))
+
+    def iter_dfs(self, start=None, state=None): # Yield nodes in DFS pre-order as they are reached (from every node when start is None)
+        return self._dfs_order(range(1, self.nodes+1) if start is None else [start], self._fresh_state(state).visited)
+
+    def _dfs_order(self, roots, visited): # Iterative pre-order DFS, same order as the recursive version
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = True
+            yield root
+            work = [iter(self._successors(root))] # Iterators over the remaining neighbors of the nodes on the path
+            while work:
+                for neighbor in work[-1]:
+                    if not visited[neighbor]: # If the neighbor has not been visited
+                        visited[neighbor] = True
+                        yield neighbor
+                        work.append(iter(self._successors(neighbor)))
+                        if self.stats is not None and len(work) > self.stats.stack_high_water:
+                            self.stats.stack_high_water = len(work)
+                        break
+                else:
+                    work.pop()
+
+    @_timed
     def dfs_all(self):  # Perform DFS on all nodes if not every nodes are connected
         self.reset_visited()  # Reset visited list before running DFS
-        nodes = []
-        for node in range(1, self.nodes+1): 
-            if not self.visited[node]: # If the node has not been visited
-                nodes += self.dfs(node) # Perform DFS on the node
-        return nodes
\ No newline at end of file
+        if self.graph_type == "mmap":
+            return self.dfs_all_array().tolist()
+        return list(self._cached(("dfs_all",), self._dfs_all))
+
+    def _dfs_all(self):
+        return tuple(self._dfs_order(range(1, self.nodes+1), bytearray(self.nodes + 1)))
+
+    def dfs_all_array(self): # Same as dfs_all as a read-only array, memory-mapped on mmap graphs (the traversal keeps its state in files too)
+        if self.graph_type == "mmap":
+            return self._cached(("dfs_all_array",), lambda: out_of_core.dfs(self.graph))
+        return _read_only(np.array(self._cached(("dfs_all",), self._dfs_all), dtype=np.int32))
@@ -1,38 +1,133 @@
+import argparse
+import csv
+import io
+import json
 import os
-import random
-
-def generate_dag_data(n):
-    data = []
-    for i in range(1, n+1):
-        possible_neighbors = list(range(i+2, n+1))  # Exclude the node itself
-        edges = random.sample(possible_neighbors, min(random.randint(0, len(possible_neighbors)), n-i))
-        data.append((i, edges))
-    return data
-
-# def create_dag_files(start, end, step):
-#     for num_nodes in range(start, end+1, step):
-#         with open(os.path.join('Sortowania-Topologiczne-grafy/Time measuring/data', f'dag_file{num_nodes}.txt'), 'w') as f:
-#             f.write("matrix\n")  # Graph type
-#             f.write(str(num_nodes) + '\n')  # Number of nodes
-#             dag_data = generate_dag_data(num_nodes)  # Generate DAG data
-#             for node, edges in dag_data:
-#                 f.write(str(node) + ' ' + ' '.join(map(str, edges)) + '\n')  # Nodes and their neighbors
-#                 # f.write(' '.join(map(str, edges)) + '\n')  # Nodes and their neighbors
-#             f.write("tarjan\n")  # Last line
-#             f.write("exit\n")  # Last line
-
-
-def create_dag_files(start, end, step):
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Benchmark the real Graph class from the repository root
+import Graph_class as Graph_class # type: ignore
+import graph_generator as graph_generator # type: ignore
+
+Graph = Graph_class.Graph
+
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+OPERATIONS = ["tarjan", "dfs_all", "bfs", "frontier_kahn", "find_start_node", "load", "export"]
+FIELDS = ["operation", "graph_type", "nodes", "saturation", "edges", "repeats", "median", "p95", "min"]
+
+
+def create_dag_files(start, end, step, probability=0.5, graph_type="matrix"):
     for num_nodes in range(start, end+1, step):
-        with open(os.path.join('Sortowania-Topologiczne-grafy/Time measuring/data', f'dag_file{num_nodes}.txt'), 'w') as f:
-            f.write("matrix\n")  # Graph type
-            f.write(str(num_nodes) + '\n')  # Number of nodes
-            dag_data = generate_dag_data(num_nodes)  # Generate DAG data
-            for node, edges in dag_data:
-                f.write(' '.join(map(str, edges)) + '\n')  # Nodes and their neighbors
-            f.write("tarjan\n")  # Last line
-            f.write("exit\n")  # Last line
-
-os.makedirs('Sortowania-Topologiczne-grafy/Time measuring/data', exist_ok=True)
-
-create_dag_files(10, 200, 10)
+        graph = graph_generator.random_dag(num_nodes, probability, graph_type, seed=num_nodes)  # Seeded -> the same files every time
+        graph.save_file(os.path.join(DATA_FOLDER, f'dag_file{num_nodes}.txt'), ["tarjan", "exit"])  # Graph followed by the commands to run
+
+
+def measure(setup, func, repeats): # Time func(setup()) with perf_counter, running setup outside of the measured part
+    times = []
+    for _ in range(repeats):
+        argument = setup()
+        start = time.perf_counter()
+        func(argument)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def reset_tarjan(graph): # Fresh per-run state and no cached results, so every repeat sorts the graph from scratch
+    graph.reset_visited()
+    graph.clear_results()
+    return graph
+
+
+def benchmark_graph(graph, operation, repeats, folder): # Times of one operation on one graph
+    if operation == "tarjan":
+        start_node = reset_tarjan(graph).find_start_node()
+        if start_node is None:
+            return None  # Nothing to sort on a cyclic graph
+        return measure(lambda: reset_tarjan(graph), lambda g: g.tarjan(start_node), repeats)
+    elif operation == "dfs_all":
+        return measure(lambda: reset_tarjan(graph), lambda g: g.dfs_all(), repeats)
+    elif operation == "bfs":  # NumPy frontier BFS from every source node, covers the same nodes as dfs_all on a DAG
+        sources = np.flatnonzero(reset_tarjan(graph).in_degrees()[1:] == 0) + 1
+        return measure(lambda: reset_tarjan(graph), lambda g: g.bfs_distances(sources), repeats)
+    elif operation == "frontier_kahn":  # NumPy frontier topological order, compare with tarjan
+        return measure(lambda: reset_tarjan(graph), lambda g: g.frontier_order(), repeats)
+    elif operation == "find_start_node":
+        return measure(lambda: reset_tarjan(graph), lambda g: g.find_start_node(), repeats)
+    elif operation == "load":
+        file_path = os.path.join(folder, f"{graph.graph_type}_{graph.nodes}.txt")
+        graph.save_file(file_path)
+        return measure(lambda: file_path, lambda path: Graph.from_file(path).to_csr(), repeats)  # to_csr -> csr edges are built, not only buffered
+    elif operation == "export":
+        return measure(lambda: reset_tarjan(graph) and io.StringIO(), graph.export, repeats)
+    raise ValueError(f"Unknown operation: {operation}")
+
+
+def run(node_counts, saturations, graph_types, operations, repeats, seed):
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for nodes in node_counts:
+            for saturation in saturations:
+                for graph_type in graph_types:
+                    graph = graph_generator.random_dag(nodes, saturation, graph_type, seed=seed)
+                    edges = len(graph.to_csr()[1])
+                    for operation in operations:
+                        times = benchmark_graph(graph, operation, repeats, folder)
+                        if times is None:
+                            continue
+                        results.append({
+                            "operation": operation,
+                            "graph_type": graph_type,
+                            "nodes": nodes,
+                            "saturation": saturation,
+                            "edges": edges,
+                            "repeats": repeats,
+                            "median": float(np.median(times)),
+                            "p95": float(np.percentile(times, 95)),
+                            "min": min(times),
+                        })
+                        print(f"{operation:16} {graph_type:10} nodes={nodes:<8} saturation={saturation:<6} median={results[-1]['median']:.6f}s")
+    return results
+
+
+def write_results(results, output): # CSV or JSON, chosen by the file extension
+    with open(output, 'w', newline='') as f:
+        if output.endswith('.json'):
+            json.dump(results, f, indent=2)
+        else:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', default='100,200,400', help='comma-separated node counts')
+    parser.add_argument('--saturations', default='0.1,0.5', help='comma-separated edge probabilities')
+    parser.add_argument('--types', default=','.join(Graph_class.GRAPH_TYPES), help='comma-separated graph representations')
+    parser.add_argument('--operations', default=','.join(OPERATIONS))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='results.csv', help='.csv or .json file for the results')
+    parser.add_argument('--create-data', action='store_true', help='only write the dag_file*.txt inputs to the data folder')
+    args = parser.parse_args()
+
+    if args.create_data:
+        os.makedirs(DATA_FOLDER, exist_ok=True)
+        create_dag_files(10, 200, 10)
+        return
+
+    results = run([int(n) for n in args.nodes.split(',')],
+                  [float(s) for s in args.saturations.split(',')],
+                  args.types.split(','),
+                  args.operations.split(','),
+                  args.repeats,
+                  args.seed)
+    write_results(results, args.output)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import numpy as np
+from levels import frontier_targets
+
+
+def _frontier(sources): # Start nodes as a sorted array without repeats
+    return np.unique(np.asarray(sources, dtype=np.int64).reshape(-1))
+
+
+def bfs_distances(indptr, indices, sources): # Level-synchronous BFS -> edges on a shortest path from the sources to every node (-1 when unreachable)
+    distance = np.full(len(indptr) - 1, -1, dtype=np.int64)  # Index 0 is unused
+    frontier = _frontier(sources)
+    distance[frontier] = 0
+    level = 0
+    while len(frontier):  # One NumPy step per level instead of one Python step per node
+        level += 1
+        targets = frontier_targets(indptr, indices, frontier)
+        frontier = np.unique(targets[distance[targets] < 0])  # Nodes reached for the first time
+        distance[frontier] = level
+    return distance
+
+
+def reachable(indptr, indices, sources): # Nodes reachable from the sources (the sources included), in ascending order
+    return np.flatnonzero(bfs_distances(indptr, indices, sources) >= 0)
+
+
+def topological_order(indptr, indices): # Kahn's algorithm a whole frontier at a time -> (order, nodes left over because of a cycle)
+    nodes = len(indptr) - 2
+    in_degree = np.bincount(indices, minlength=nodes+1)
+    frontier = np.flatnonzero(in_degree[1:] == 0) + 1
+    order = []
+    while len(frontier):
+        order.append(frontier)
+        targets, counts = np.unique(frontier_targets(indptr, indices, frontier), return_counts=True)  # Faster than np.subtract.at over the raw targets
+        in_degree[targets] -= counts  # Remove every edge leaving the frontier
+        frontier = targets[in_degree[targets] == 0]
+    order = np.concatenate(order) if order else np.empty(0, dtype=np.int64)
+    remaining = np.flatnonzero(in_degree[1:] > 0) + 1 if len(order) < nodes else np.empty(0, dtype=np.int64)
+    return order, remaining
@@ -0,0 +1,100 @@
+import json
+import re
+from itertools import chain, islice
+
+import numpy as np
+import Graph_class as Graph_class
+
+Graph = Graph_class.Graph
+
+FORMATS = {"dot": "graph.dot", "edges": "graph.edges", "json": "graph.json", "bin": "graph.bin"}  # Format -> default file name
+_DOT_EDGE = re.compile(r"^\s*(\d+)\s*->\s*(\d+)")
+
+
+def _edges_from_lines(graph, lines, parse_line, batch_lines=65536): # Add edges parsed from text lines in batches
+    while True:
+        batch = list(islice(lines, batch_lines))
+        if not batch:
+            return graph
+        pairs = [pair for pair in map(parse_line, batch) if pair is not None]
+        if pairs:
+            edges = np.array(pairs, dtype=np.int32)
+            graph.add_edges(edges[:, 0], edges[:, 1])
+
+
+def write_dot(graph, file): # Graphviz DOT, the node count and representation are kept in a comment for read_dot
+    file.write(f"// nodes {graph.nodes} type {graph.graph_type}\n")
+    file.write("digraph G {\n")
+    file.write("".join(f"  {node};\n" for node in range(1, graph.nodes+1)))  # Also lists the nodes without edges
+    for sources, targets in graph.edge_blocks():
+        np.savetxt(file, np.column_stack((sources, targets)), fmt="  %d -> %d;")
+    file.write("}\n")
+
+
+def read_dot(file, graph_type=None):
+    header = file.readline().split()  # ["//", "nodes", N, "type", T]
+    graph = Graph(int(header[2]), graph_type or header[4])
+    def parse_line(line):
+        match = _DOT_EDGE.match(line)
+        return (int(match.group(1)), int(match.group(2))) if match else None
+    return _edges_from_lines(graph, file, parse_line)
+
+
+def write_edge_list(graph, file): # One "source target" pair per line after a "# nodes N type T" header
+    file.write(f"# nodes {graph.nodes} type {graph.graph_type}\n")
+    for sources, targets in graph.edge_blocks():
+        np.savetxt(file, np.column_stack((sources, targets)), fmt="%d %d")
+
+
+def read_edge_list(file, graph_type=None):
+    header = file.readline().split()  # ["#", "nodes", N, "type", T]
+    graph = Graph(int(header[2]), graph_type or header[4])
+    def parse_line(line):
+        pair = line.split()
+        return (int(pair[0]), int(pair[1])) if len(pair) == 2 else None
+    return _edges_from_lines(graph, file, parse_line)
+
+
+def write_json(graph, file): # {"nodes": N, "graph_type": T, "adjacency": {"1": [...], ...}}, written one node at a time
+    file.write(f'{{"nodes": {graph.nodes}, "graph_type": "{graph.graph_type}", "adjacency": {{')
+    indptr, indices = graph.to_csr()
+    for node in range(1, graph.nodes+1):
+        separator = ", " if node > 1 else ""
+        file.write(f'{separator}"{node}": {json.dumps(indices[indptr[node]:indptr[node+1]].tolist())}')
+    file.write("}}\n")
+
+
+def read_json(file, graph_type=None):
+    data = json.load(file)
+    graph = Graph(data["nodes"], graph_type or data["graph_type"])
+    adjacency = data["adjacency"]
+    counts = [len(edges) for edges in adjacency.values()]
+    targets = np.fromiter(chain.from_iterable(adjacency.values()), dtype=np.int32, count=sum(counts))
+    graph.add_edges(np.repeat(np.array(list(adjacency), dtype=np.int32), counts), targets)  # All edges in one bulk call
+    return graph
+
+
+def write_binary(graph, file): # Raw little-endian int32 (source, target) pairs, the first pair is (nodes, representation)
+    file.write(np.array([graph.nodes, Graph_class.GRAPH_TYPES.index(graph.graph_type)], dtype="<i4").tobytes())
+    for sources, targets in graph.edge_blocks():
+        file.write(np.column_stack((sources, targets)).astype("<i4").tobytes())
+
+
+def read_binary(file, graph_type=None, batch_edges=65536): # Reads any binary file object (also pipes and BytesIO) a batch of pairs at a time
+    nodes, type_index = np.frombuffer(file.read(8), dtype="<i4").tolist()
+    graph = Graph(nodes, graph_type or Graph_class.GRAPH_TYPES[type_index])
+    while True:
+        data = file.read(8 * batch_edges)
+        if not data:
+            return graph
+        while len(data) % 8:  # A pipe or stream may return a partial pair
+            more = file.read(8 - len(data) % 8)
+            if not more:
+                raise ValueError("Truncated binary graph file.")
+            data += more
+        edges = np.frombuffer(data, dtype="<i4").reshape(-1, 2)
+        graph.add_edges(edges[:, 0], edges[:, 1])
+
+
+WRITERS = {"dot": write_dot, "edges": write_edge_list, "json": write_json, "bin": write_binary}
+READERS = {"dot": read_dot, "edges": read_edge_list, "json": read_json, "bin": read_binary}
@@ -0,0 +1,76 @@
+import numpy as np
+import Graph_class as Graph_class
+
+Graph = Graph_class.Graph
+
+
+def _to_graph(nodes, sources, targets, graph_type): # Build a Graph of the requested representation from edge arrays
+    keys = sources.astype(np.int64) * (nodes + 1) + targets  # One sortable key per edge
+    keys.sort()  # Neighbors in ascending order, the same for every representation
+    keys = keys[np.diff(keys, prepend=-1) != 0]  # Drop repeated edges
+    graph = Graph(nodes, graph_type)
+    graph.add_edges(keys // (nodes + 1), keys % (nodes + 1))
+    return graph
+
+
+def _relabel(nodes, sources, targets, rng): # Shuffle node numbers so that node 1..n is not already a topological order
+    labels = np.empty(nodes+1, dtype=np.int64)
+    labels[0] = 0
+    labels[1:] = rng.permutation(nodes) + 1
+    return labels[sources], labels[targets]
+
+
+def band_dag(nodes, saturation, graph_type="matrix"): # Every node points to the next int(nodes*saturation) nodes (as generate_dag in main.py)
+    width = int(nodes * saturation)
+    counts = np.minimum(width, nodes - np.arange(1, nodes+1))  # The last nodes have fewer successors left
+    sources = np.repeat(np.arange(1, nodes+1), counts)
+    offsets = np.arange(len(sources)) - np.repeat(np.cumsum(counts) - counts, counts)  # Position of every edge within its node
+    return _to_graph(nodes, sources, sources + offsets + 1, graph_type)
+
+
+def _dense_pairs(nodes, probability, rng, dense_limit): # One random number per pair i < j, about dense_limit pairs at a time (rows of the upper triangle)
+    counts = nodes - np.arange(1, nodes+1)  # Pairs of every row
+    ends = np.cumsum(counts)
+    sources, targets = [], []
+    row = 0
+    while row < nodes - 1:
+        stop = max(int(np.searchsorted(ends, ends[row] - counts[row] + dense_limit, side="right")), row + 1)  # Rows that fit in the block
+        block = counts[row:stop]
+        rows = np.repeat(np.arange(row, stop), block)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(block) - block, block) + rows + 1
+        keep = rng.random(len(rows)) < probability  # Same random stream as one call for all pairs
+        sources.append(rows[keep] + 1)
+        targets.append(columns[keep] + 1)
+        row = stop
+    if not sources:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(sources), np.concatenate(targets)
+
+
+def random_dag(nodes, probability, graph_type="matrix", seed=None, dense_limit=4_000_000): # Erdos-Renyi DAG: every pair i < j gets an edge with the given probability
+    rng = np.random.default_rng(seed)
+    pairs = nodes * (nodes - 1) // 2
+    if pairs <= dense_limit or probability > 0.01:  # Few pairs, or so many edges that drawing them would repeat pairs -> one random number per pair
+        sources, targets = _dense_pairs(nodes, probability, rng, dense_limit)
+    else:  # Many pairs and few edges -> draw the number of edges, then the edges themselves (memory follows the edges, not the pairs)
+        count = rng.binomial(pairs, probability)
+        first = rng.integers(1, nodes+1, count)
+        second = rng.integers(1, nodes+1, count)
+        keep = first != second
+        sources, targets = np.minimum(first, second)[keep], np.maximum(first, second)[keep]  # Repeated pairs are dropped by _to_graph
+    sources, targets = _relabel(nodes, sources, targets, rng)
+    return _to_graph(nodes, sources, targets, graph_type)
+
+
+def layered_dag(nodes, layers, probability, graph_type="matrix", seed=None): # Nodes split into layers, edges only go from a layer to the next one
+    rng = np.random.default_rng(seed)
+    layer_of = np.sort(rng.integers(0, layers, nodes))  # Layer of every node (0-based node positions)
+    starts = np.searchsorted(layer_of, np.arange(layers + 1))  # Nodes of layer l are starts[l]..starts[l+1]-1
+    sizes = np.diff(starts)
+    next_layer = np.minimum(layer_of + 1, layers)
+    next_sizes = np.append(sizes, 0)[next_layer]  # Size of the following layer (0 for the last layer)
+    counts = rng.binomial(next_sizes, probability)  # Out-degree of every node
+    sources = np.repeat(np.arange(nodes), counts)
+    targets = starts[np.repeat(next_layer, counts)] + (rng.random(len(sources)) * np.repeat(next_sizes, counts)).astype(np.int64)
+    sources, targets = _relabel(nodes, sources + 1, targets + 1, rng)
+    return _to_graph(nodes, sources, targets, graph_type)
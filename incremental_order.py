@@ -0,0 +1,97 @@
+class IncrementalOrder: # Topological order kept up to date while edges are added (Pearce-Kelly algorithm)
+    def __init__(self, graph):
+        indptr, indices = graph.to_csr()
+        indices = indices.tolist()
+        self.nodes = graph.nodes
+        self.successors = [indices[indptr[node]:indptr[node+1]] for node in range(self.nodes+1)]
+        self.predecessors = [[] for _ in range(self.nodes+1)]
+        for node in range(1, self.nodes+1):
+            for neighbor in self.successors[node]:
+                self.predecessors[neighbor].append(node)
+
+        order, remaining = graph.topological_sort()
+        self.cycle = bool(remaining)  # Once the graph has a cycle there is no order to maintain
+        self.node_at = order + remaining  # Node at every position of the order
+        self.position = [0] * (self.nodes+1)  # Position of every node in the order
+        for position, node in enumerate(self.node_at):
+            self.position[node] = position
+
+    def order(self): # Current topological order, or None if the graph contains a cycle
+        return None if self.cycle else list(self.node_at)
+
+    def before(self, first, second): # Whether first comes before second in the current order, O(1)
+        return self.position[first] < self.position[second]
+
+    def remove_edges(self, node, edges): # Removing edges never breaks the order, only the adjacency is updated
+        for edge in edges:
+            self.successors[node].remove(edge)
+            self.predecessors[edge].remove(node)
+        if self.cycle and edges:  # The removed edges may have broken the cycle -> order the nodes again
+            self._rebuild()
+
+    def _rebuild(self): # Kahn's algorithm over the current adjacency, sets node_at, position and cycle
+        in_degree = [len(predecessors) for predecessors in self.predecessors]
+        order = [node for node in range(1, self.nodes+1) if in_degree[node] == 0]
+        for node in order:  # The list grows while it is read, as a queue
+            for neighbor in self.successors[node]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    order.append(neighbor)
+        remaining = [node for node in range(1, self.nodes+1) if in_degree[node] > 0]
+        self.cycle = bool(remaining)
+        self.node_at = order + remaining
+        for position, node in enumerate(self.node_at):
+            self.position[node] = position
+
+    def add_edges(self, node, edges):
+        for edge in edges:
+            self.add_edge(node, edge)
+
+    def add_edge(self, source, target):
+        self.successors[source].append(target)
+        self.predecessors[target].append(source)
+        if self.cycle:
+            return
+        lower, upper = self.position[target], self.position[source]
+        if lower > upper:  # The edge already agrees with the order
+            return
+        forward = self._forward(target, upper)  # Nodes reachable from target that are not after source
+        if forward is None:
+            self.cycle = True  # target reaches source -> the new edge closes a cycle
+            return
+        backward = self._backward(source, lower)  # Nodes reaching source that are not before target
+        self._reorder(backward, forward)
+
+    def _forward(self, start, upper):
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in self.successors[node]:
+                position = self.position[neighbor]
+                if position == upper:
+                    return None
+                if position < upper and neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return list(seen)
+
+    def _backward(self, start, lower):
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in self.predecessors[node]:
+                if self.position[neighbor] > lower and neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return list(seen)
+
+    def _reorder(self, backward, forward): # Move the nodes reaching source in front of the nodes reachable from target, reusing their positions
+        backward.sort(key=self.position.__getitem__)
+        forward.sort(key=self.position.__getitem__)
+        nodes = backward + forward
+        positions = sorted(self.position[node] for node in nodes)
+        for node, position in zip(nodes, positions):
+            self.position[node] = position
+            self.node_at[position] = node
@@ -0,0 +1,77 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_shared = {}  # Arrays attached in a worker process: name -> (SharedMemory, array)
+
+
+def frontier_targets(indptr, indices, frontier): # Targets of every out-edge of the frontier nodes, gathered without a Python loop
+    starts = indptr[frontier].astype(np.int64)
+    counts = indptr[frontier + 1] - starts
+    first = np.cumsum(counts) - counts  # Where the edges of every frontier node start in the result
+    positions = np.arange(counts.sum()) + np.repeat(starts - first, counts)
+    return indices[positions]
+
+
+def _count_targets(indptr, indices, frontier): # Distinct targets of the frontier and how many frontier edges point at each
+    return np.unique(frontier_targets(indptr, indices, frontier), return_counts=True)
+
+
+def _share(array): # Copy an array into a new shared memory block
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def _attach(name, shape, dtype): # Worker initializer: map one of the shared arrays
+    block = shared_memory.SharedMemory(name=name)
+    _shared[name] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+
+def _worker_init(indptr_spec, indices_spec):
+    _attach(*indptr_spec)
+    _attach(*indices_spec)
+    _shared["csr"] = (_shared[indptr_spec[0]][1], _shared[indices_spec[0]][1])
+
+
+def _worker_count(frontier):
+    indptr, indices = _shared["csr"]
+    return _count_targets(indptr, indices, frontier)
+
+
+def topological_levels(indptr, indices, processes=0, parallel_threshold=50_000): # Antichains of the graph -> (levels, nodes left over because of a cycle)
+    nodes = len(indptr) - 2
+    in_degree = np.bincount(indices, minlength=nodes+1)
+    frontier = np.flatnonzero(in_degree[1:] == 0) + 1  # Level 0: nodes with no incoming edges
+    levels = []
+    done = 0
+
+    pool = blocks = None
+    if processes > 1:  # The CSR arrays are shared once, workers only receive frontier slices
+        blocks = [_share(indptr), _share(indices)]
+        specs = [(block.name, array.shape, array.dtype) for block, array in zip(blocks, (indptr, indices))]
+        pool = ProcessPoolExecutor(processes, initializer=_worker_init, initargs=specs)
+    try:
+        while len(frontier):
+            levels.append(frontier.tolist())
+            done += len(frontier)
+            if pool is not None and len(frontier) >= parallel_threshold:  # Large level -> reduce in-degrees in parallel per partition
+                parts = list(pool.map(_worker_count, np.array_split(frontier, processes)))
+                for targets, counts in parts:  # The targets of a partition are distinct, so its counts are subtracted directly
+                    in_degree[targets] -= counts
+                frontier = np.sort(np.concatenate([targets[in_degree[targets] == 0] for targets, _ in parts]))
+                frontier = frontier[np.diff(frontier, prepend=-1) != 0]  # A node reached from several partitions is found once per partition
+            else:
+                targets, counts = _count_targets(indptr, indices, frontier)
+                in_degree[targets] -= counts
+                frontier = targets[in_degree[targets] == 0]  # Nodes whose predecessors are all in earlier levels
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+    remaining = np.flatnonzero(in_degree[1:] > 0) + 1 if done < nodes else np.empty(0, dtype=np.int64)
+    return levels, remaining.tolist()
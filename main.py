@@ -1,28 +1,30 @@
 import argparse
+import asyncio
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 import Graph_class as Graph_class
+import graph_formats as graph_formats
+import graph_generator as graph_generator
+import query_server as query_server
+import snapshot as snapshot
 
 Graph = Graph_class.Graph
 
 
-def generate_dag(nodes, saturation): # Dag - Directed Acyclic Graph
-    graph = [[0 for _ in range(nodes)] for _ in range(nodes)]
-
-    # Add edges to the graph
-    for i in range(nodes): # For each node
-        for j in range(i+1, min(i+1+int(nodes*saturation), nodes)): # Add edges to the next nodes depending on the saturation
-            graph[i][j] = 1 # Add an edge to the next node
-
-    return graph
-
 def load_user_provided_graph(): # Load a user-provided graph (ask for data)
 
-    valid_types = ["matrix", "list", "table"]
+    valid_types = Graph_class.GRAPH_TYPES
     graph_type = ""
 
     while graph_type not in valid_types:
         graph_type = input("type> ").lower()
         if graph_type not in valid_types:
-            print("Invalid type. Please enter either 'matrix', 'list', or 'table'.")
+            print("Invalid type. Please enter either 'matrix', 'bitmatrix', 'list', 'table', 'csr' or 'mmap'.")
 
     nodes = int(input("Nodes> "))
     graph = Graph(nodes, graph_type)
@@ -38,69 +40,272 @@ def display_help(): # Display help
     print("help     -   display help")
     print("dfs      -   perform Depth-First Search on the graph")
     print("tarjan   -   perform Tarjan's algorithm on the graph")
-    print("export   -   export the graph to a LaTeX file")
+    print("kahn     -   perform Kahn's topological sort on the graph")
+    print("levels   -   group the nodes into topological levels (waves)")
+    print("bfs      -   distances from the given nodes, e.g. 'bfs 1 4'")
+    print("add      -   add edges, e.g. 'add 3 5 6' adds 3->5 and 3->6")
+    print("order    -   topological order kept up to date as edges are added")
+    print("export   -   export the graph to a LaTeX file, e.g. 'export layered 500' (layout, max nodes)")
+    print("             or to another format: 'export dot', 'export edges', 'export json', 'export bin'")
+    print("stats    -   enable / show traversal statistics ('stats off' disables them)")
+    print("profile  -   run a command under cProfile, e.g. 'profile tarjan'")
+    print("memory   -   run a command under tracemalloc, e.g. 'memory dfs'")
     print("exit     -   exit the program")
 
+def parse_nodes(graph, words): # Node numbers typed by the user -> list of ints, or None after printing why they are not nodes of the graph
+    for word in words:
+        if not word.isdigit() or not 1 <= int(word) <= graph.nodes:
+            print(f"Invalid node: {word}. Nodes are numbered 1..{graph.nodes}.")
+            return None
+    return list(map(int, words))
+
+BATCH_OPERATIONS = {  # Batch command -> function returning a JSON-serialisable result
+    "tarjan": lambda graph: graph.scc_order(),
+    "dfs": lambda graph: graph.dfs_all(),
+    "kahn": lambda graph: dict(zip(("order", "remaining"), graph.topological_sort())),
+    "levels": lambda graph: dict(zip(("levels", "remaining"), graph.topological_levels())),
+}
+
+def run_batch_file(file_path, operations, graph_type, results_cache=False, mmap_dir=None): # Load one file and run the operations on it (also used by the process pool)
+    try:
+        return run_batch_operations(file_path, operations, graph_type, results_cache, mmap_dir)
+    except (OSError, ValueError) as error:  # A missing or malformed file is reported, the other files of the batch still run
+        return {"file": file_path, "error": str(error)}
+
+def run_batch_operations(file_path, operations, graph_type, results_cache, mmap_dir):
+    if operations:
+        graph = Graph.load(file_path, graph_type, mmap_dir)
+    else:  # Run the commands written at the end of the file, which the binary cache does not keep
+        graph = Graph.from_file(file_path, graph_type, directory=mmap_dir)
+        operations = [command for command in graph.commands if command != "exit"]
+    if results_cache:
+        graph.load_results(file_path + ".results")  # Results of an earlier run on the same edges
+    result = {"file": file_path, "nodes": graph.nodes, "graph_type": graph.graph_type}
+    for operation in operations:
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown batch command: {operation}")
+        result[operation] = BATCH_OPERATIONS[operation](graph)
+    if results_cache:
+        graph.save_results(file_path + ".results")
+    return result
+
+def print_batch_result(result, output_format):
+    if output_format == "json":
+        print(json.dumps(result))  # One JSON object per line
+        return
+    if "error" in result:
+        print(f"{result['file']}: error: {result['error']}")
+        return
+    print(f"{result['file']} ({result['nodes']} nodes, {result['graph_type']}):")
+    for key, value in result.items():
+        if key not in ("file", "nodes", "graph_type"):
+            print(f"  {key}: {'The graph contains a cycle.' if value is None else value}")
+
+def run_batch(file_paths, operations, graph_type, output_format, jobs, results_cache=False, mmap_dir=None): # Process many graph files in one interpreter, optionally in parallel -> number of files that failed
+    for operation in operations or []:  # Checked once, not reported again for every file
+        if operation not in BATCH_OPERATIONS:
+            raise ValueError(f"Unknown batch command: {operation}")
+    count = len(file_paths)
+    failed = 0
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = pool.map(run_batch_file, file_paths, [operations] * count, [graph_type] * count, [results_cache] * count, [mmap_dir] * count)
+            for result in results:  # map keeps the order of the files
+                print_batch_result(result, output_format)
+                failed += "error" in result
+    else:
+        for file_path in file_paths:
+            result = run_batch_file(file_path, operations, graph_type, results_cache, mmap_dir)
+            print_batch_result(result, output_format)
+            failed += "error" in result
+    return failed
+
+def run_command(graph, command): # Run one REPL command on the graph
+    if command == "dfs":
+        if graph is not None:
+            graph.reset_visited()  # Reset visited list before running DFS
+            print("Depth-First Search:")
+            print(graph.dfs_all())
+        else:
+            print("No graph to perform DFS on.")
+    elif command == "tarjan":
+        if graph is not None:
+            sccs = graph.scc_order()  # Every component of the graph, cycles are ordered as one component each
+            if any(len(scc) > 1 for scc in sccs):
+                print("The graph contains a cycle, the nodes of every cycle are grouped in parentheses.")
+            print('[' + ', '.join(' '.join(map(str, scc)) if len(scc) == 1 else '(' + ' '.join(map(str, scc)) + ')' for scc in sccs) + ']')
+        else:
+            print("No graph to perform Tarjan's algorithm on.")
+    elif command == "kahn":
+        if graph is not None:
+            order, remaining = graph.topological_sort()
+            if remaining:
+                print("The graph contains a cycle. Nodes left over:")
+                print(remaining)
+            else:
+                print(order)
+        else:
+            print("No graph to perform Kahn's algorithm on.")
+    elif command == "levels":
+        if graph is not None:
+            graph_levels, remaining = graph.topological_levels()
+            for level, nodes in enumerate(graph_levels):
+                print(f"{level}: {nodes}")
+            if remaining:
+                print("The graph contains a cycle. Nodes left over:")
+                print(remaining)
+        else:
+            print("No graph to compute levels of.")
+    elif command.startswith("bfs "):
+        if graph is not None:
+            sources = parse_nodes(graph, command.split()[1:])
+            if not sources:
+                if sources is not None:
+                    print("Give at least one node to start from, e.g. 'bfs 1 4'.")
+                return
+            distance = graph.bfs_distances(sources)
+            for level in range(int(distance.max()) + 1):  # Nodes grouped by their distance
+                print(f"{level}: {(distance == level).nonzero()[0].tolist()}")
+        else:
+            print("No graph to search.")
+    elif command.startswith("add "):
+        if graph is not None:
+            nodes = parse_nodes(graph, command.split()[1:])  # Checked before any edge is added, so a typo leaves the graph unchanged
+            if not nodes:
+                if nodes is not None:
+                    print("Give the node and its new successors, e.g. 'add 3 5 6'.")
+                return
+            node, *successors = nodes
+            graph.add_edges([node] * len(successors), successors)  # Appends to the existing edges of the node
+            print(f"Added {len(successors)} edge(s) from {node}.")
+        else:
+            print("No graph to add edges to.")
+    elif command == "order":
+        if graph is not None:
+            try:
+                if graph.order_tracker is None:
+                    graph.track_order()  # From now on add_edge keeps the order up to date
+            except ValueError as error:
+                print(error)
+                return
+            order = graph.order_tracker.order()
+            print("The graph contains a cycle." if order is None else order)
+        else:
+            print("No graph to keep an order for.")
+    elif command == "export" or command.startswith("export "):
+        if graph is not None:
+            options = command.split()[1:]  # export [circle|layered] [max nodes] or export dot|edges|json|bin
+            if options and options[0] in graph_formats.FORMATS:
+                file_name = graph_formats.FORMATS[options[0]]
+                with open(file_name, "wb" if options[0] == "bin" else "w", buffering=1 << 20) as export_file:
+                    graph_formats.WRITERS[options[0]](graph, export_file)
+                print(f"Graph exported to {file_name}.")
+                return
+            layout = options[0] if options else "circle"
+            if layout not in Graph_class.LAYOUTS:  # Checked before graph.tex is opened, so a typo does not erase the last export
+                print(f"Unknown layout: {layout}. Use 'circle', 'layered' or one of {', '.join(graph_formats.FORMATS)}.")
+                return
+            if len(options) > 1 and not options[1].isdigit():
+                print(f"Invalid number of nodes: {options[1]}")
+                return
+            max_nodes = int(options[1]) if len(options) > 1 else None
+            with open("graph.tex", "w", buffering=1 << 20) as tex_file:
+                graph.export(tex_file, layout, max_nodes)
+            print("Graph exported to graph.tex.")
+        else:
+            print("No graph to export.")
+    elif command == "help":
+        display_help()
+    elif command.startswith("stats"):
+        if graph is None:
+            print("No graph to collect statistics on.")
+        elif command == "stats off":
+            graph.disable_stats()
+            print("Statistics disabled.")
+        elif graph.stats is None:
+            graph.enable_stats()
+            print("Statistics enabled, run commands and type 'stats' again to see them.")
+        else:
+            print(graph.refresh_stats())
+    elif command.startswith("profile "):
+        profiler = cProfile.Profile()
+        profiler.runcall(run_command, graph, command[len("profile "):])
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(15)
+    elif command.startswith("memory "):
+        tracemalloc.start()
+        run_command(graph, command[len("memory "):])
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Memory allocated: {current} bytes, peak: {peak} bytes")
+    else:
+        print("Unknown command.")
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--generate', action='store_true')
     parser.add_argument('--user-provided', action='store_true')
+    parser.add_argument('--file', action='append', default=[], help='load the graph from a dag_file (cached as FILE.npy for faster reloads), can be repeated')
+    parser.add_argument('--dir', help='run in batch mode on every .txt file of a directory')
+    parser.add_argument('--type', choices=Graph_class.GRAPH_TYPES, help='representation to generate or load the file into')
+    parser.add_argument('--run', help='batch mode: comma-separated commands (' + ','.join(BATCH_OPERATIONS) + '), by default the ones at the end of each file')
+    parser.add_argument('--format', choices=['text', 'json'], default='text', help='batch output format (json -> one object per line)')
+    parser.add_argument('--jobs', type=int, default=1, help='batch mode: number of worker processes')
+    parser.add_argument('--results-cache', action='store_true', help='batch mode: reuse / store results in FILE.results next to each graph file')
+    parser.add_argument('--mmap-dir', help='directory for the files of --type mmap graphs (default $TMPDIR, use a disk for graphs larger than memory)')
+    parser.add_argument('--serve', metavar='SOCKET', help='answer queries (' + ','.join(query_server.QUERIES) + ') on a unix socket instead of the prompt')
+    parser.add_argument('--workers', type=int, default=4, help='--serve: number of threads answering queries')
     args = parser.parse_args()
 
+    file_paths = list(args.file)
+    if args.dir:
+        file_paths += sorted(os.path.join(args.dir, name) for name in os.listdir(args.dir) if name.endswith('.txt'))
+    if args.run is not None or args.dir or len(file_paths) > 1:  # Batch mode, no prompts
+        operations = [operation.strip().lower() for operation in args.run.split(',')] if args.run else None
+        try:
+            failed = run_batch(file_paths, operations, args.type, args.format, args.jobs, args.results_cache, args.mmap_dir)
+        except ValueError as error:
+            sys.exit(str(error))
+        if failed:
+            sys.exit(1)  # The errors were printed with the results
+        return
+
     graph = None
     if args.generate:
         nodes = int(input("Nodes> "))
         saturation = float(input("Saturation> "))/100
 
-        graph = generate_dag(nodes, saturation)  # Generate a directed acyclic graph (DAG)
+        graph = graph_generator.band_dag(nodes, saturation, args.type or "matrix")  # Generate a directed acyclic graph (DAG)
         print("Generated graph:")
-        for row in graph:  # For each row in the graph
-            print(' '.join(map(str, row)))  # Print the row
+        if graph.graph_type == "matrix":
+            for row in graph.graph[1:, 1:]:  # For each row in the graph
+                print(' '.join(map(str, row.astype(int))))  # Print the row
+        else:
+            print(graph.to_csr() if graph.graph_type in ("csr", "mmap") else graph.graph)
         
     elif args.user_provided:
         graph_type, graph = load_user_provided_graph()
         print(f"Graph representation: {graph_type}")
         print("User-provided graph:")
-        print(graph.graph)
+        print(graph.to_csr() if graph_type in ("csr", "mmap") else graph.graph)
+
+    elif file_paths:
+        graph = Graph.load(file_paths[0], args.type, args.mmap_dir)
+        print(f"Loaded graph from {file_paths[0]} ({graph.nodes} nodes, {graph.graph_type})")
+
+    if args.serve and graph is not None:  # Every query runs on a frozen snapshot, so the worker threads never share traversal state
+        server = query_server.QueryServer(snapshot.GraphSnapshot(graph), args.workers)
+        print(f"Serving queries on {args.serve}")
+        try:
+            asyncio.run(server.serve(args.serve))
+        except KeyboardInterrupt:
+            pass
+        return
 
     while True:
         command = input("> ").lower()
-        if command == "dfs":
-            if graph is not None:
-                graph.reset_visited()  # Reset visited list before running DFS
-                print("Depth-First Search:")
-                print(graph.dfs_all())
-            else:
-                print("No graph to perform DFS on.")
-        elif command == "tarjan":
-            if graph is not None:
-                graph.reset_visited()  # Reset visited list before running Tarjan's algorithm
-                start_node = graph.find_start_node()
-                if start_node is None:
-                    print("The graph contains a cycle.")
-                else:
-                    graph.tarjan(start_node)  # Run Tarjan's algorithm
-                    graph.sccs.reverse()
-                    print('[', end='')
-                    for scc in graph.sccs:
-                        print(*scc, end="" + ', ' if scc != graph.sccs[-1] else '')
-                    print(']')
-                    
-            else:
-                print("No graph to perform Tarjan's algorithm on.")
-        elif command == "export":
-            if graph is not None:
-                with open("graph.tex", "w") as tex_file:
-                    graph.export(tex_file)
-                print("Graph exported to graph.tex.")
-            else:
-                print("No graph to export.")
-        elif command == "help":
-            display_help()
-        elif command == "exit":
+        if command == "exit":
             break
-        else:
-            print("Unknown command.")
+        run_command(graph, command)
 
 if __name__ == "__main__":
     main()
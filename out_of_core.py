@@ -0,0 +1,210 @@
+import os
+import shutil
+import weakref
+
+import numpy as np
+import levels
+
+CHUNK_EDGES = 1 << 22  # Most edges (or nodes) held in memory at once by the functions of this module
+
+
+def _map(path, dtype, length, mode="r"): # memmap of a whole file, also for an empty one (numpy cannot map 0 bytes)
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode=mode, shape=(length,))
+
+
+class EdgeStore: # CSR arrays in memory-mapped files, filled from edge chunks by an external merge sort
+    def __init__(self, directory, nodes):
+        self.directory = directory
+        self.nodes = nodes
+        self._files = 0  # Counter for unique file names, arrays handed out earlier are never overwritten
+        self.degree = self.scratch("degree", np.int64, nodes+1, keep=True)  # Out-degree of every node over all edges added so far
+        self.indptr = np.zeros(nodes+2, dtype=np.int64)  # Built CSR arrays, replaced by csr() after edges were added
+        self.indices = np.zeros(0, dtype=np.int32)
+        self._runs = []  # Source-sorted runs written since the last build: [sources path, targets path, length, last source]
+        self._writers = None  # Open (sources, targets) files of the last run
+        weakref.finalize(self, shutil.rmtree, directory, True)  # The files live as long as the store
+
+    def scratch(self, name, dtype, length, keep=False): # New zero-filled memory-mapped array; without keep the file is unlinked at once and lives as long as the array
+        path = os.path.join(self.directory, f"{name}.{self._files}.{np.dtype(dtype).name}")
+        self._files += 1
+        array = _map(path, dtype, length, "w+")
+        if not keep and length:
+            os.unlink(path)
+        return array
+
+    def memory_usage(self): # Bytes in the files (page cache, not process memory)
+        return self.indptr.nbytes + self.indices.nbytes + self.degree.nbytes + sum(run[2] * 8 for run in self._runs)
+
+    def append(self, sources, targets): # Add edges (source[i] -> target[i]), a chunk at a time
+        for start in range(0, len(sources), CHUNK_EDGES):
+            self._append_chunk(np.asarray(sources[start:start+CHUNK_EDGES], dtype=np.int32),
+                               np.asarray(targets[start:start+CHUNK_EDGES], dtype=np.int32))
+
+    def _append_chunk(self, sources, targets):
+        if len(sources) > 1 and np.any(sources[1:] < sources[:-1]):
+            order = np.argsort(sources, kind="stable")  # Sort the chunk in memory, keeping the order of each node's edges
+            sources, targets = sources[order], targets[order]
+        if not self._runs or self._writers is None or sources[0] < self._runs[-1][3]:  # Out of order -> start a new run
+            self._close_run()
+            paths = [os.path.join(self.directory, f"run.{self._files}.{name}.int32") for name in ("sources", "targets")]
+            self._files += 1
+            self._writers = [open(path, "wb") for path in paths]
+            self._runs.append(paths + [0, 0])
+        self._writers[0].write(sources.tobytes())
+        self._writers[1].write(targets.tobytes())
+        run = self._runs[-1]
+        run[2] += len(sources)
+        run[3] = int(sources[-1])
+        first = int(sources[0])
+        self.degree[first:run[3]+1] += np.bincount(sources - first)  # The chunk covers the nodes first..last
+
+    def _close_run(self):
+        if self._writers is not None:
+            for writer in self._writers:
+                writer.close()
+            self._writers = None
+
+    def csr(self): # (indptr, indices) as read-only memory maps, merging the runs written since the last call
+        if not self._runs:
+            return self.indptr, self.indices
+        self._close_run()
+        indptr = self.scratch("indptr", np.int64, self.nodes+2, keep=True)
+        total = 0
+        for start in range(0, self.nodes+1, CHUNK_EDGES):  # indptr = running sum of the degrees
+            part = np.cumsum(self.degree[start:start+CHUNK_EDGES]) + total
+            indptr[start+1:start+1+len(part)] = part
+            total = int(part[-1])
+        indptr.flush()
+
+        runs = [(_map(sources, np.int32, length), _map(targets, np.int32, length)) for sources, targets, length, _ in self._runs]
+        if len(self.indices) == 0 and len(runs) == 1:  # Edges added in source order (e.g. a dag_file) -> the targets already are the indices
+            path = os.path.join(self.directory, f"indices.{self._files}.int32")
+            self._files += 1
+            os.replace(self._runs[0][1], path)
+            indices = _map(path, np.int32, total)
+        else:
+            indices = self.scratch("indices", np.int32, total, keep=True)
+            self._merge(indptr, indices, runs)
+        for sources, targets, _, _ in self._runs:
+            for path in (sources, targets):
+                if os.path.exists(path):
+                    os.unlink(path)
+        self._runs = []
+        for old in (self.indptr, self.indices):
+            if isinstance(old, np.memmap):
+                os.unlink(old.filename)  # Arrays returned earlier keep their mapping
+        self.indptr = _map(indptr.filename, np.int64, self.nodes+2)
+        self.indices = _map(indices.filename, np.int32, total) if total else indices
+        return self.indptr, self.indices
+
+    def _merge(self, indptr, indices, runs): # Merge the built arrays and the runs one window of nodes at a time
+        start = 0
+        while start <= self.nodes:
+            stop = int(np.searchsorted(indptr, indptr[start] + CHUNK_EDGES, side="right")) - 1  # Nodes whose edges fit in one chunk
+            stop = min(max(stop, start+1), self.nodes+1)
+            counts = np.diff(self.indptr[start:stop+1])
+            sources = [np.repeat(np.arange(start, stop, dtype=np.int32), counts)]  # The built edges come first, then the runs in the order they were added
+            targets = [self.indices[self.indptr[start]:self.indptr[stop]]]
+            for run_sources, run_targets in runs:
+                first, last = np.searchsorted(run_sources, [start, stop])
+                sources.append(run_sources[first:last])
+                targets.append(run_targets[first:last])
+            order = np.argsort(np.concatenate(sources), kind="stable")
+            indices[indptr[start]:indptr[stop]] = np.concatenate(targets)[order]
+            start = stop
+        indices.flush()
+
+
+def in_degrees(indptr, indices, out): # Count the incoming edges of every node into out, a chunk of edges at a time
+    for start in range(0, len(indices), CHUNK_EDGES):
+        targets, counts = np.unique(indices[start:start+CHUNK_EDGES], return_counts=True)
+        out[targets] += counts
+    return out
+
+
+def topological_sort(store): # Kahn's algorithm with its queue and in-degrees in files -> (order, nodes left over because of a cycle) as arrays
+    indptr, indices = store.csr()
+    in_degree = in_degrees(indptr, indices, store.scratch("in_degree", np.int64, store.nodes+1))
+    order = store.scratch("order", np.int32, store.nodes, keep=True)  # Also the queue: order[head:tail] are the nodes waiting
+    tail = 0
+    for start in range(1, store.nodes+1, CHUNK_EDGES):  # The nodes with no incoming edges, in node order
+        sources = np.flatnonzero(in_degree[start:start+CHUNK_EDGES] == 0) + start
+        order[tail:tail+len(sources)] = sources
+        tail += len(sources)
+    head = 0
+    while head < tail:
+        # Every node queued before this batch is processed before the nodes the batch queues, so taking a whole
+        # prefix of the queue at once gives the same order as removing the nodes one by one
+        batch = np.asarray(order[head:min(tail, head + CHUNK_EDGES // 16)], dtype=np.int64)
+        edges = np.cumsum(indptr[batch + 1] - indptr[batch])
+        batch = batch[:max(1, int(np.searchsorted(edges, CHUNK_EDGES, side="right")))]  # Keep the edges of the batch within a chunk
+        head += len(batch)
+        targets = levels.frontier_targets(indptr, indices, batch)
+        if len(targets) == 0:
+            continue
+        nodes, from_end, counts = np.unique(targets[::-1], return_index=True, return_counts=True)  # from_end: last edge to every target, counted from the end
+        in_degree[nodes] -= counts
+        done = in_degree[nodes] == 0
+        ready = nodes[done][np.argsort(-from_end[done], kind="stable")]  # Queued in the order of the edge that removed their last incoming edge
+        order[tail:tail+len(ready)] = ready
+        tail += len(ready)
+    remaining = store.scratch("remaining", np.int32, store.nodes - tail, keep=True)
+    found = 0
+    for start in range(1, store.nodes+1, CHUNK_EDGES):  # Nodes on a cycle or reachable only through one
+        left = np.flatnonzero(in_degree[start:start+CHUNK_EDGES] > 0) + start
+        remaining[found:found+len(left)] = left
+        found += len(left)
+    order, remaining = order[:tail], remaining
+    for array in (order, remaining):
+        array.flags.writeable = False  # Cached by the graph, callers must not change it
+    return order, remaining
+
+
+def dfs(store, window=4096): # Pre-order DFS from every unvisited node, with the visited flags, the path and the result in files
+    result = store.scratch("dfs", np.int32, store.nodes, keep=True)
+    # Plain ndarray views of the same mappings, indexing a memmap object one element at a time is several times slower
+    indptr, indices = map(np.asarray, store.csr())
+    visited = np.asarray(store.scratch("visited", np.uint8, store.nodes+1))
+    path = np.asarray(store.scratch("path", np.int32, store.nodes+1))  # Nodes on the current path
+    cursor = np.asarray(store.scratch("cursor", np.int64, store.nodes+1))  # Next edge to look at for every node on the path
+    order = np.asarray(result)
+    count = 0
+    for start in range(1, store.nodes+1, window * 16):
+        for root in (np.flatnonzero(visited[start:start + window*16] == 0) + start).tolist():
+            if visited[root]:  # Reached from an earlier root of the same chunk
+                continue
+            visited[root] = 1
+            order[count] = root
+            count += 1
+            depth = 0
+            path[0] = root
+            cursor[0] = indptr[root]
+            while depth >= 0:
+                node = int(path[depth])
+                edge, end = int(cursor[depth]), int(indptr[node+1])
+                while edge < end:  # Skip visited neighbors a window of edges at a time
+                    neighbors = indices[edge:min(end, edge + window)]
+                    if len(neighbors) <= 32:  # Short lists are faster to scan without NumPy
+                        free = next((position for position, neighbor in enumerate(neighbors.tolist()) if not visited[neighbor]), None)
+                    else:
+                        free = np.flatnonzero(visited[neighbors] == 0)
+                        free = int(free[0]) if len(free) else None
+                    if free is not None:
+                        edge += free
+                        break
+                    edge += len(neighbors)
+                if edge < end:  # Descend into the first unvisited neighbor
+                    child = int(indices[edge])
+                    cursor[depth] = edge + 1
+                    visited[child] = 1
+                    order[count] = child
+                    count += 1
+                    depth += 1
+                    path[depth] = child
+                    cursor[depth] = indptr[child]
+                else:
+                    depth -= 1
+    result.flags.writeable = False
+    return result
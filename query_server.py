@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+QUERIES = {  # Query name -> function of (snapshot, integer arguments) returning a JSON-serialisable result
+    "dfs": lambda snapshot, *args: snapshot.dfs(*args),
+    "sccs": lambda snapshot, *args: snapshot.sccs(*args),
+    "tarjan": lambda snapshot: snapshot.scc_order(),  # As the tarjan command of main.py
+    "kahn": lambda snapshot: dict(zip(("order", "remaining"), snapshot.topological_sort())),
+    "levels": lambda snapshot: dict(zip(("levels", "remaining"), snapshot.topological_levels())),
+    "successors": lambda snapshot, node: snapshot.successors(node),
+}
+
+
+def answer(snapshot, query): # Run one text query ("dfs 5", "tarjan", ...) -> {"query": ..., "result": ...} or {"query": ..., "error": ...}
+    name, *args = query.split()
+    try:
+        if name not in QUERIES:
+            raise ValueError(f"Unknown query: {name}")
+        return {"query": query, "result": QUERIES[name](snapshot, *map(int, args))}
+    except (ValueError, TypeError, IndexError) as error:
+        return {"query": query, "error": str(error)}
+
+
+class QueryServer: # Answers newline-separated queries on a unix socket with one JSON line each, in batches run on worker threads
+    def __init__(self, snapshot, workers=4, batch_size=256, batch_delay=0.002):
+        self.snapshot = snapshot
+        self.batch_size = batch_size  # Most queries answered by one worker call
+        self.batch_delay = batch_delay  # Seconds to wait for more queries after the first one of a batch
+        self.executor = ThreadPoolExecutor(workers)
+        self.requests = None  # asyncio.Queue of (query, future), created in the server's event loop
+
+    def _answer_batch(self, queries): # Runs on a worker thread, every distinct query of the batch is answered once
+        answers = {}
+        for query in queries:
+            if query not in answers:
+                answers[query] = answer(self.snapshot, query)
+        return [answers[query] for query in queries]
+
+    async def _run_batch(self, batch):
+        try:
+            answers = await asyncio.get_running_loop().run_in_executor(self.executor, self._answer_batch, [query for query, _ in batch])
+        except Exception as error:  # Never leave the clients of the batch waiting
+            answers = [{"query": query, "error": str(error)} for query, _ in batch]
+        for (_, future), result in zip(batch, answers):
+            if not future.done():
+                future.set_result(result)
+
+    async def _batcher(self): # Collect the queries that arrive close together and hand them to a worker as one batch
+        running = set()
+        while True:
+            batch = [await self.requests.get()]
+            await asyncio.sleep(self.batch_delay)
+            while len(batch) < self.batch_size and not self.requests.empty():
+                batch.append(self.requests.get_nowait())
+            task = asyncio.create_task(self._run_batch(batch))  # Batches run concurrently, up to the number of workers
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+    async def _handle_client(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        replies = asyncio.Queue()  # Futures in the order of the client's queries, so the answers keep that order
+        sender = asyncio.create_task(self._send(replies, writer))
+        try:
+            async for line in reader:
+                query = " ".join(line.decode().split())
+                if not query:
+                    continue
+                future = loop.create_future()
+                self.requests.put_nowait((query, future))
+                replies.put_nowait(future)
+        finally:
+            replies.put_nowait(None)
+            await sender
+
+    async def _send(self, replies, writer):
+        try:
+            while (future := await replies.get()) is not None:
+                writer.write((json.dumps(await future) + "\n").encode())
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, socket_path): # Serve until cancelled
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)  # Left over from an earlier run
+        self.requests = asyncio.Queue()
+        batcher = asyncio.create_task(self._batcher())
+        server = await asyncio.start_unix_server(self._handle_client, path=socket_path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.executor.shutdown(wait=False)
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+async def send_queries(socket_path, queries): # Client side: send the queries over one connection -> list of answers in the same order
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    writer.write("".join(query + "\n" for query in queries).encode())
+    await writer.drain()
+    answers = [json.loads(await reader.readline()) for _ in queries]
+    writer.close()
+    await writer.wait_closed()
+    return answers
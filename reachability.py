@@ -0,0 +1,138 @@
+import numpy as np
+
+METHODS = ["bitset", "interval"]
+
+
+def estimate_memory(graph, method, labels=3): # Bytes the index would take, so the method can be chosen before building it
+    if method == "bitset":
+        return (graph.nodes + 1) * ((graph.nodes + 64) // 64) * 8  # One bit per (source, target) pair
+    elif method == "interval":
+        return (graph.nodes + 1) * (3 + 2 * labels) * 8  # Rank, tree interval and two numbers per labelling
+    raise ValueError(f"Unknown reachability method: {method}")
+
+
+class ReachabilityIndex: # Answers "can u reach v?" on a DAG without a traversal per query
+    def __init__(self, graph, method="auto", labels=3, memory_limit=256 * 2**20, seed=0):
+        order, remaining = graph.topological_sort()
+        if remaining:
+            raise ValueError("The graph contains a cycle, the reachability index needs a DAG.")
+        if method == "auto":  # The full closure when it fits, labels otherwise
+            method = "bitset" if estimate_memory(graph, "bitset") <= memory_limit else "interval"
+        if method not in METHODS:
+            raise ValueError(f"Unknown reachability method: {method}")
+        self.method = method
+        self.nodes = graph.nodes
+        self.indptr, self.indices = graph.to_csr()  # Shared with the graph (read-only), the successors are sliced from them
+        self.rank = np.zeros(self.nodes+1, dtype=np.int64)  # Position in a topological order
+        self.rank[order] = np.arange(len(order))
+        if method == "bitset":
+            self._build_bitset(order)
+        else:
+            self._build_intervals(order, labels, np.random.default_rng(seed))
+
+    def memory_usage(self):
+        if self.method == "bitset":
+            return self.closure.nbytes
+        return self.rank.nbytes + self.tree_first.nbytes + self.tree_last.nbytes + self.post.nbytes + self.low.nbytes
+
+    def _build_bitset(self, order): # Transitive closure, row u has bit v set when u reaches v; rows filled in reverse topological order
+        words = (self.nodes + 64) // 64
+        self.closure = np.zeros((self.nodes+1, words), dtype=np.uint64)
+        nodes = np.arange(self.nodes+1)
+        self.closure[nodes, nodes >> 6] = np.left_shift(np.uint64(1), (nodes & 63).astype(np.uint64))  # Every node reaches itself
+        for node in reversed(order):
+            successors = self.indices[self.indptr[node]:self.indptr[node+1]]
+            if len(successors):
+                self.closure[node] |= np.bitwise_or.reduce(self.closure[successors], axis=0)
+
+    def _build_intervals(self, order, labels, rng): # DFS tree intervals (prove reachability) and random post-order labels (disprove it)
+        self.tree_first = np.zeros(self.nodes+1, dtype=np.int64)  # Pre-order number in the first DFS forest
+        self.tree_last = np.zeros(self.nodes+1, dtype=np.int64)  # Largest pre-order number in the node's DFS subtree
+        self.post = np.zeros((labels, self.nodes+1), dtype=np.int64)  # Post-order number per labelling
+        self.low = np.zeros((labels, self.nodes+1), dtype=np.int64)  # Smallest post-order number reachable per labelling
+        for label in range(labels):
+            roots = order if label == 0 else rng.permutation(order).tolist()
+            self._label_traversal(label, roots, rng if label > 0 else None)
+
+    def _label_traversal(self, label, roots, rng):
+        visited = [False] * (self.nodes+1)
+        post, low = self.post[label], self.low[label]
+        counter = 0
+        preorder = 0
+        for root in roots:
+            if visited[root]:
+                continue
+            visited[root] = True
+            if rng is None:
+                self.tree_first[root] = preorder
+                preorder += 1
+            work = [(root, iter(self._children(root, rng)))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if not visited[child]:
+                        visited[child] = True
+                        if rng is None:
+                            self.tree_first[child] = preorder
+                            preorder += 1
+                        work.append((child, iter(self._children(child, rng))))
+                        break
+                else:
+                    work.pop()
+                    counter += 1
+                    post[node] = counter
+                    low[node] = min([counter] + [low[child] for child in self._successors(node)])  # Children are finished (DAG)
+                    if rng is None:
+                        self.tree_last[node] = preorder - 1
+
+    def _successors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node+1]].tolist()
+
+    def _children(self, node, rng):
+        successors = self._successors(node)
+        if rng is None:
+            return successors
+        return rng.permutation(successors).tolist() if len(successors) > 1 else successors
+
+    def reaches(self, source, target): # Whether there is a path from source to target (every node reaches itself)
+        if self.method == "bitset":
+            return bool((int(self.closure[source, target >> 6]) >> (target & 63)) & 1)
+        decided = self._decide(source, target)
+        if decided is not None:
+            return decided
+        return self._search(source, target)
+
+    def _decide(self, source, target): # True / False when the labels settle the query, None otherwise
+        if self.tree_first[source] <= self.tree_first[target] <= self.tree_last[source]:
+            return True  # target is in the DFS subtree of source
+        if self.rank[source] > self.rank[target]:
+            return False  # target comes first in the topological order
+        if np.any((self.low[:, target] < self.low[:, source]) | (self.post[:, target] > self.post[:, source])):
+            return False  # The post-order interval of target is not inside the one of source
+        return None
+
+    def _search(self, source, target): # DFS that only enters nodes whose labels still allow reaching target
+        seen = {source}
+        stack = [source]
+        while stack:
+            for child in self._successors(stack.pop()):
+                if child not in seen:
+                    decided = self._decide(child, target)
+                    if decided:
+                        return True
+                    if decided is None:
+                        seen.add(child)
+                        stack.append(child)
+        return False
+
+    def reaches_many(self, sources, targets): # Answer many queries at once -> boolean array
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if self.method == "bitset":
+            words = self.closure[sources, targets >> 6]
+            return ((words >> (targets & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+        result = (self.tree_first[sources] <= self.tree_first[targets]) & (self.tree_first[targets] <= self.tree_last[sources])
+        impossible = (self.rank[sources] > self.rank[targets]) | np.any((self.low[:, targets] < self.low[:, sources]) | (self.post[:, targets] > self.post[:, sources]), axis=0)
+        for query in np.flatnonzero(~result & ~impossible):  # Only the queries the labels cannot settle are searched
+            result[query] = self._search(int(sources[query]), int(targets[query]))
+        return result
@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+import Graph_class as Graph_class
+import levels
+
+
+def _read_only(array): # Private copy of an array that nobody can write to
+    array = np.array(array, dtype=np.int32)
+    array.flags.writeable = False
+    return array
+
+
+class GraphSnapshot: # Frozen CSR copy of a graph, any number of threads can query it at once (every call uses its own traversal state)
+    def __init__(self, graph):
+        indptr, indices = graph.to_csr()
+        frozen = Graph_class.Graph(graph.nodes, "csr")  # Runs the traversals, never changed after this point
+        frozen.graph = (_read_only(indptr), _read_only(indices))
+        in_degree = np.bincount(frozen.graph[1], minlength=graph.nodes+1)
+        in_degree.flags.writeable = False
+        set_attribute = super().__setattr__
+        set_attribute("nodes", graph.nodes)
+        set_attribute("graph_type", graph.graph_type)  # Representation the snapshot was taken from
+        set_attribute("generation", graph.generation)
+        set_attribute("indptr", frozen.graph[0])
+        set_attribute("indices", frozen.graph[1])
+        set_attribute("in_degree", in_degree)
+        set_attribute("_graph", frozen)
+        set_attribute("_results", {})  # Query -> immutable result, the snapshot never changes so nothing is ever evicted
+        set_attribute("_lock", threading.Lock())  # Only guards _results, the queries themselves run in parallel
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GraphSnapshot is read-only")
+
+    def _cached(self, key, compute): # Result of compute(), computed outside of the lock (two threads may both compute it, one result is kept)
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+        value = compute()
+        with self._lock:
+            return self._results.setdefault(key, value)
+
+    def _check_node(self, node): # Nodes come from clients, negative numbers would silently index from the end of the arrays
+        if not 1 <= node <= self.nodes:
+            raise ValueError(f"Node {node} is not in 1..{self.nodes}")
+
+    def successors(self, node):
+        self._check_node(node)
+        return self.indices[self.indptr[node]:self.indptr[node+1]].tolist()
+
+    def dfs(self, start=None): # DFS pre-order from start, or from every node when start is None
+        if start is not None:
+            self._check_node(start)
+        return list(self._graph.iter_dfs(start))
+
+    def sccs(self, start=None): # Strongly connected components in the order Tarjan's algorithm finds them (reverse topological order)
+        if start is not None:
+            self._check_node(start)
+        return [list(scc) for scc in self._graph.iter_sccs(start)]
+
+    def tarjan_order(self): # Same result as Graph.tarjan_order: components from the first source node in topological order (None on a cycle)
+        return self._cached(("tarjan_order",), self._tarjan_order)
+
+    def _tarjan_order(self):
+        sources = np.flatnonzero(self.in_degree[1:] == 0)
+        if len(sources) == 0:
+            return None
+        sccs = [tuple(scc) for scc in self._graph.iter_sccs(int(sources[0]) + 1)]
+        sccs.reverse()
+        return tuple(sccs)
+
+    def scc_order(self): # Same result as Graph.scc_order: every component of the graph in topological order, also on cycles
+        return [list(scc) for scc in self._cached(("scc_order",), self._scc_order)]
+
+    def _scc_order(self):
+        sccs = [tuple(scc) for scc in self._graph.iter_sccs()]  # Every unvisited node starts a new search
+        sccs.reverse()
+        return tuple(sccs)
+
+    def topological_sort(self): # Kahn's algorithm -> (topological order, nodes left over because of a cycle)
+        order, remaining = self._cached(("topological_sort",), self._topological_sort)
+        return list(order), list(remaining)
+
+    def _topological_sort(self):
+        in_degree = self.in_degree.tolist()  # Every call consumes its own copy
+        order = tuple(self._graph._kahn(in_degree))
+        return order, tuple(node for node in range(1, self.nodes+1) if in_degree[node] > 0)
+
+    def topological_levels(self): # Levels of the DAG -> (levels, nodes left over because of a cycle)
+        graph_levels, remaining = self._cached(("topological_levels",), self._topological_levels)
+        return [list(level) for level in graph_levels], list(remaining)
+
+    def _topological_levels(self):
+        graph_levels, remaining = levels.topological_levels(self.indptr, self.indices)
+        return tuple(tuple(level) for level in graph_levels), tuple(remaining)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import Graph_class as Graph_class
+
+
+@pytest.mark.parametrize("graph_type", Graph_class.GRAPH_TYPES)
+def test_csr_arrays_cannot_be_changed_by_callers(graph_type):
+    graph = Graph_class.Graph(4, graph_type)
+    graph.add_edges([1, 2], [2, 3])
+    indptr, indices = graph.to_csr()
+    with pytest.raises(ValueError):
+        indices[0] = 4
+    assert graph.to_csr()[1].tolist() == [2, 3]
+
+
+def test_dfs_records_the_stack_high_water_mark():
+    graph = Graph_class.Graph(5, "csr")
+    graph.add_edges([1, 2, 3, 1], [2, 3, 4, 5])  # Path 1 -> 2 -> 3 -> 4 and a short branch 1 -> 5
+    stats = graph.enable_stats()
+    assert graph.dfs_all() == [1, 2, 3, 4, 5]
+    assert stats.stack_high_water == 4  # One iterator per node on the path 1, 2, 3, 4
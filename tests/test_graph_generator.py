@@ -0,0 +1,21 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import graph_generator as graph_generator
+
+
+def test_random_dag_blocks_do_not_change_the_graph():
+    whole = graph_generator.random_dag(300, 0.2, "csr", seed=5)
+    blocks = graph_generator.random_dag(300, 0.2, "csr", seed=5, dense_limit=1000)  # Many blocks of rows
+    for expected, found in zip(whole.to_csr(), blocks.to_csr()):
+        assert np.array_equal(expected, found)
+
+
+def test_random_dag_sparse_path_is_acyclic():
+    graph = graph_generator.random_dag(3000, 0.001, "csr", seed=1)  # More pairs than dense_limit, few edges
+    order, remaining = graph.topological_sort()
+    assert len(order) == 3000 and remaining == []
+    assert 3500 < len(graph.to_csr()[1]) < 5500  # About 4500 expected edges
@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import Graph_class as Graph_class
+
+
+def test_order_recovers_when_a_cycle_is_removed():
+    graph = Graph_class.Graph(3, "list")
+    tracker = graph.track_order()
+    graph.add_edge(1, [2])
+    graph.add_edge(2, [1])
+    assert tracker.order() is None
+    graph.add_edge(2, [])  # Replaces the successors of 2, the cycle is gone
+    assert tracker.order() == graph.topological_sort()[0]
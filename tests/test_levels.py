@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import graph_generator as graph_generator
+import levels as levels
+
+
+def test_parallel_levels_match_serial():
+    for graph in (graph_generator.layered_dag(3000, 5, 0.01, "csr", seed=1), graph_generator.random_dag(500, 0.01, "csr", seed=2)):
+        indptr, indices = graph.to_csr()  # Most targets are reached from several partitions of a level
+        expected = levels.topological_levels(indptr, indices)
+        assert levels.topological_levels(indptr, indices, processes=3, parallel_threshold=1) == expected
@@ -0,0 +1,44 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import Graph_class as Graph_class
+import main as main
+
+
+def _graph():
+    graph = Graph_class.Graph(4, "csr")
+    graph.add_edges([1, 2], [2, 3])
+    return graph
+
+
+def test_bfs_rejects_what_is_not_a_node(capsys):
+    graph = _graph()
+    for command in ("bfs 999", "bfs x", "bfs 0", "bfs -1", "bfs "):
+        main.run_command(graph, command)
+        assert capsys.readouterr().out.startswith(("Invalid node", "Give at least one node"))
+    main.run_command(graph, "bfs 1")
+    assert capsys.readouterr().out == "0: [1]\n1: [2]\n2: [3]\n"
+
+
+def test_add_leaves_the_graph_unchanged_on_a_bad_node(capsys):
+    graph = _graph()
+    for command in ("add 999 1", "add 1 999", "add 1 x", "add "):
+        main.run_command(graph, command)
+        assert capsys.readouterr().out.startswith(("Invalid node", "Give the node"))
+    assert [array.tolist() for array in graph.to_csr()] == [[0, 0, 1, 2, 2, 2], [2, 3]]
+    main.run_command(graph, "add 3 4")
+    assert capsys.readouterr().out == "Added 1 edge(s) from 3.\n"
+    assert graph.dfs_all() == [1, 2, 3, 4]
+
+
+def test_batch_reports_a_missing_file_and_goes_on(tmp_path, capsys):
+    graph_file = tmp_path / "graph.txt"
+    graph_file.write_text("list\n3\n2\n3\n\n")
+    paths = [str(graph_file), str(tmp_path / "missing.txt"), str(graph_file)]
+    assert main.run_batch(paths, ["kahn"], None, "json", 1) == 1
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["file"] for result in results] == paths
+    assert "No such file" in results[1]["error"]
+    assert results[0]["kahn"] == results[2]["kahn"] == {"order": [1, 2, 3], "remaining": []}
@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import Graph_class as Graph_class
+import graph_generator as graph_generator
+import out_of_core as out_of_core
+
+
+def _edge_chunks(seed, cyclic): # A DAG in source order followed by unsorted chunks, which close cycles when cyclic is set
+    base = graph_generator.random_dag(300, 0.04, "csr", seed=seed)
+    indptr, indices = base.to_csr()
+    order = np.array(base.topological_sort()[0])
+    chunks = [(np.repeat(np.arange(301), np.diff(indptr)), indices)]
+    rng = np.random.default_rng(seed)
+    for _ in range(3):
+        first, second = rng.integers(0, 300, 80), rng.integers(0, 300, 80)
+        if not cyclic:  # Forward edges in the topological order keep the graph acyclic
+            first, second = np.minimum(first, second), np.maximum(first, second)
+            keep = first < second
+            first, second = first[keep], second[keep]
+        chunks.append((order[first], order[second]))
+    return chunks
+
+
+def test_mmap_matches_list_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(out_of_core, "CHUNK_EDGES", 64)  # Many runs, merge windows and Kahn batches
+    for seed, cyclic in [(0, False), (1, False), (2, True), (3, True)]:
+        reference = Graph_class.Graph(300, "list")
+        mapped = Graph_class.Graph(300, "mmap", str(tmp_path))
+        for number, (sources, targets) in enumerate(_edge_chunks(seed, cyclic)):
+            reference.add_edges(sources, targets)
+            mapped.add_edges(sources, targets)
+            if number == 1:
+                mapped.to_csr()  # Later runs are merged into built arrays
+        assert np.array_equal(reference.to_csr()[1], mapped.to_csr()[1])
+        assert np.array_equal(reference.in_degrees(), mapped.in_degrees())
+        assert reference.topological_sort() == mapped.topological_sort()
+        assert reference.dfs_all() == mapped.dfs_all()
+
+
+def test_mmap_files_go_to_the_given_directory(tmp_path):
+    graph = Graph_class.Graph(10, "mmap", str(tmp_path))
+    graph.add_edges([1, 2], [2, 3])
+    graph.to_csr()
+    assert os.path.dirname(graph.graph.directory) == str(tmp_path)
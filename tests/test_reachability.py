@@ -0,0 +1,19 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  # Modules live in the repository root
+import graph_generator as graph_generator
+import reachability as reachability
+
+
+def test_methods_agree_with_a_search():
+    graph = graph_generator.random_dag(200, 0.02, "csr", seed=2)
+    reached = [None] + [set(graph.reachable([node])) for node in range(1, 201)]
+    sources, targets = np.meshgrid(np.arange(1, 201), np.arange(1, 201))
+    expected = [target in reached[source] for source, target in zip(sources.ravel().tolist(), targets.ravel().tolist())]
+    for method in reachability.METHODS:
+        index = reachability.ReachabilityIndex(graph, method)
+        assert index.reaches_many(sources.ravel(), targets.ravel()).tolist() == expected
+        assert [index.reaches(source, target) for source, target in zip(sources.ravel().tolist()[:500], targets.ravel().tolist()[:500])] == expected[:500]